@@ -0,0 +1,79 @@
+"""Compare parsers.parse_numeric with the old chained str.replace cleanup.
+
+Usage: python benchmarks/bench_parsers.py [rows]
+
+Times are the best of three untraced runs. Peak memory comes from a separate
+run and adds the Python heap peak (tracemalloc, which also sees numpy
+buffers) to the Arrow memory pool peak, which tracemalloc can't see.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import parse_numeric
+
+
+def legacy_parse(values, col):
+    """The cleanup load_data() used before parsers.py."""
+    if col == 'Pay_Ratio':
+        values = values.astype(str).str.replace(',', '')
+        values = values.str.split(':').str[0]
+    elif col in ['Salary', 'Median_Worker_Pay']:
+        values = values.astype(str).str.replace('$', '', regex=False).str.replace(',', '')
+    else:
+        values = values.astype(str).str.replace(',', '')
+    return pd.to_numeric(values, errors='coerce')
+
+
+def sample_column(col, rows, seed=0):
+    """Workbook-formatted text cells for one column."""
+    rng = np.random.default_rng(seed)
+    if col == 'Pay_Ratio':
+        cells = [f"{v:,}:1" for v in rng.integers(10, 7000, rows)]
+    else:
+        cells = [f"${v:,}" for v in rng.integers(30_000, 150_000_000, rows)]
+    return pd.Series(cells, dtype=object)
+
+
+def measure(fn, *args, repeat=3):
+    # Timed without tracing: tracemalloc slows object-heavy code far more than Arrow kernels
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+
+    # A fresh proxy pool, so its high-water mark covers this call's Arrow buffers only
+    default_pool = pa.default_memory_pool()
+    pool = pa.proxy_memory_pool(default_pool)
+    pa.set_memory_pool(pool)
+    tracemalloc.start()
+    try:
+        fn(*args)
+        heap_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        pa.set_memory_pool(default_pool)
+    return min(timings), heap_peak + pool.max_memory()
+
+
+def main(rows=1_000_000):
+    for col in ['Salary', 'Pay_Ratio']:
+        values = sample_column(col, rows)
+        old_time, old_peak = measure(legacy_parse, values, col)
+        new_time, new_peak = measure(parse_numeric, values)
+        print(f"{col:<10} rows={rows:,}  "
+              f"legacy {old_time:7.3f}s {old_peak / 2**20:7.1f} MiB  "
+              f"parse_numeric {new_time:7.3f}s {new_peak / 2**20:7.1f} MiB  "
+              f"({old_time / new_time:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
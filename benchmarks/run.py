@@ -0,0 +1,251 @@
+"""Time the dashboard's hot paths on synthetic data and write the results as JSON.
+
+Usage: python benchmarks/run.py [--sizes 1k,100k,1m,10m] [--output bench_results.json]
+
+Every case is run ``--repeat`` times and the fastest run is kept. Reading the
+.xlsx and building Plotly figures are only timed up to ``--excel-max-rows`` and
+``--figure-max-rows`` respectively, since both are far too slow (and Excel
+can't hold the rows) at the larger sizes. ``ingest.peak_rss_mb.*`` entries are
+megabytes, not seconds: how far each Excel load raised peak RSS in a fresh process.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import charts
+import engine
+import snapshot
+import sources
+from cube import AggregateCube
+from filters import FilterIndex, SortedIndex
+from parsers import PAY_LEVELS, clean_workbook, compact_dtypes
+from ranking import TopKIndex
+from search import SearchIndex
+
+import synthetic
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+# Loads a source in a fresh interpreter and prints how far RSS peaked above the post-import RSS (Linux only)
+_PEAK_RSS_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import sources
+from parsers import clean_workbook, compact_dtypes
+
+def status(field):
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field))
+
+with open('/proc/self/clear_refs', 'w') as f:
+    f.write('5')  # resets VmHWM to the current RSS
+before = status('VmRSS')
+{load}
+print((status('VmHWM') - before) / 1024)
+"""
+
+
+def peak_rss_mb(load):
+    """Peak RSS growth in MB of running ``load`` in a fresh process."""
+    script = _PEAK_RSS_SCRIPT.format(root=ROOT, load=load)
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    return float(out.stdout.split()[-1])
+
+
+def typical_selection(df):
+    """A selection like an analyst's: a few industries and the upper pay levels."""
+    industries = sorted(df['Industry'].unique())
+    return {'Industry': industries[::3], 'Pay_Level': PAY_LEVELS[2:]}
+
+
+def typical_ranges(dataset):
+    """Range sliders pulled in to the middle half of salary and tenure."""
+    ranges = {}
+    for col in ('Salary', 'CEO_Tenure_Years'):
+        low, high = dataset.range_options()[col]
+        ranges[col] = (low + (high - low) / 4, high - (high - low) / 4)
+    return ranges
+
+
+def figure_cases(selection):
+    summary = engine.executive_summary(selection)
+    ratios = engine.ratio_rows(selection)
+    insights = engine.industry_insights(selection)
+    scatters = engine.performance(selection)
+    corr_matrix = engine.correlation(selection)
+    return {
+        'figure.top20_bar': lambda: charts.top20_bar(summary['top20']),
+        'figure.scatter': lambda: charts.salary_vs_ratio(ratios),
+        'figure.hist': lambda: charts.ratio_histogram(ratios),
+        'figure.industry': lambda: charts.industry_average(insights['industry_avg']),
+        'figure.stacked': lambda: charts.pay_level_mix(insights['level_counts']),
+        'figure.tenure': lambda: charts.tenure_vs_salary(scatters['tenure_rows']),
+        'figure.employees': lambda: charts.size_vs_salary(scatters['employee_rows']),
+        'figure.corr': lambda: charts.correlation_heatmap(corr_matrix),
+    }
+
+
+def run_size(rows, args, workdir):
+    results = {}
+
+    def record(case, fn, repeat=args.repeat):
+        seconds = best_of(fn, repeat)
+        results[case] = seconds
+        print(f"  {case:<28} {seconds * 1000:12.2f} ms", flush=True)
+
+    raw = synthetic.generate(rows, seed=args.seed)
+
+    # Ingest, reading the same rows from each supported source format
+    for ext in ('xlsx', 'csv', 'parquet', 'db'):
+        if ext == 'xlsx' and rows > args.excel_max_rows:
+            continue
+        path = synthetic.write_source(raw, os.path.join(workdir, f"synthetic-{rows}.{ext}"), sources.SQLITE_TABLE)
+        fmt = sources.source_format(path)
+        if fmt == 'excel':
+            # Every installed Excel engine on the same workbook
+            for excel_engine in sources.installed_excel_engines():
+                record(f'ingest.read_excel.{excel_engine}', lambda: sources.read_excel(path, excel_engine), repeat=1)
+            record('ingest.read_clean_streaming', lambda: sources.read_clean_streaming(path, args.chunk_rows), repeat=1)
+            # Memory of a whole read against a streamed one, each cleaned and compacted
+            rss_cases = {
+                'read_excel': f"compact_dtypes(clean_workbook(sources.read_excel({path!r})))",
+                'read_clean_streaming': f"sources.read_clean_streaming({path!r}, {args.chunk_rows})",
+            }
+            for case, load in rss_cases.items():
+                if os.path.exists('/proc/self/clear_refs'):
+                    case = f'ingest.peak_rss_mb.{case}'
+                    results[case] = peak_rss_mb(load)
+                    print(f"  {case:<28} {results[case]:12.1f} MB", flush=True)
+        else:
+            record(f'ingest.read_{fmt}', lambda: sources.read_source(path))
+        os.remove(path)
+    record('ingest.clean', lambda: clean_workbook(raw.copy()))
+    df = clean_workbook(raw.copy())
+    del raw
+    record('ingest.compact', lambda: compact_dtypes(df.copy()))
+    df = compact_dtypes(df)
+
+    snapshot.SNAPSHOT_DIR = workdir
+    record('ingest.snapshot_write', lambda: snapshot.write_snapshot(df, 'synthetic', str(rows)), repeat=1)
+    record('ingest.snapshot_read', lambda: snapshot.read_snapshot('synthetic', str(rows)))
+
+    # Load-time structures
+    record('index.filter_build', lambda: FilterIndex.build(df, engine.FILTER_COLUMNS), repeat=1)
+    record('index.cube_build', lambda: AggregateCube.build(df), repeat=1)
+    record('index.ranking_build', lambda: TopKIndex.build(df, engine.RANK_COLUMN, group_by=engine.RANK_GROUP),
+           repeat=1)
+    record('index.sorted_build', lambda: SortedIndex.build(df, engine.RANGE_COLUMNS), repeat=1)
+    record('index.search_build', lambda: SearchIndex.build(df, engine.SEARCH_COLUMNS), repeat=1)
+    dataset = engine.Dataset(df)
+
+    # Sidebar filtering
+    selections = typical_selection(df)
+    record('filter.isin', lambda: df[df['Industry'].isin(selections['Industry'])
+                                     & df['Pay_Level'].isin(selections['Pay_Level'])])
+    record('filter.bitmap', lambda: dataset.select(selections))
+    selection = dataset.select(selections)
+    ranges = typical_ranges(dataset)
+    record('filter.range_between', lambda: df[df['Salary'].between(*ranges['Salary'])
+                                              & df['CEO_Tenure_Years'].between(*ranges['CEO_Tenure_Years'])])
+    record('filter.range_sorted', lambda: dataset.select(selections, ranges))
+    record('filter.facet_isin', lambda: {
+        col: df[df[other].isin(selections[other])][col].value_counts()
+        for col, other in (('Industry', 'Pay_Level'), ('Pay_Level', 'Industry'))
+    })
+    record('filter.facet_counts', lambda: dataset.facet_counts(selections, ranges))
+    record('filter.range_kpis', lambda: dataset.select(selections, ranges).kpis)
+
+    # Per-tab computations
+    record('tab1.top20_nlargest', lambda: selection.rows.nlargest(20, 'Salary'))
+    record('tab1.top20_ranking', lambda: selection.top(20))
+    record('tab1.summary', lambda: engine.executive_summary(dataset.select(selections)))
+    record('tab2.ratio_rows', lambda: engine.ratio_rows(selection))
+    record('tab2.industry_table', lambda: engine.industry_stats(selection))
+    record('tab3.insights', lambda: engine.industry_insights(selection))
+    record('tab3.top10', lambda: engine.top_earners(selection, selections['Industry'][0]))
+    record('tab3.search_contains', lambda: selection.rows[selection.rows['CEO_Name'].str.contains('james smi', case=False)
+                                                         | selection.rows['Company'].str.contains('james smi', case=False)])
+    record('tab3.search_prefix', lambda: engine.search_ceos(selection, 'james smi'))
+    # Swapped and substituted letters; a fuzzy query that finds nothing would only time a miss
+    assert len(engine.search_ceos(selection, 'jmaes smyth')) > 0, "fuzzy search query found no rows"
+    record('tab3.search_fuzzy', lambda: engine.search_ceos(selection, 'jmaes smyth'))
+    record('tab3.search_broad', lambda: engine.search_ceos(selection, 'c'))
+    record('tab4.scatters', lambda: engine.performance(selection))
+    record('tab4.corr_rows', lambda: selection.rows[engine.CORR_COLUMNS].dropna().corr())
+    record('tab4.corr', lambda: engine.correlation(selection))
+    record('tab4.buffett', lambda: engine.buffett_model(dataset.select(selections)))
+
+    # Figure construction
+    if rows <= args.figure_max_rows:
+        for case, build in figure_cases(selection).items():
+            record(case, build, repeat=1)
+
+    return results
+
+
+def metadata():
+    import pyarrow
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'pyarrow': pyarrow.__version__,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1k,100k,1m,10m',
+                        help='comma-separated row counts, e.g. 1k,100k or 250000')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--excel-max-rows', type=int, default=100_000)
+    parser.add_argument('--figure-max-rows', type=int, default=100_000)
+    parser.add_argument('--chunk-rows', type=int, default=50_000, help='chunk size for the streaming Excel ingest')
+    args = parser.parse_args(argv)
+
+    sizes = [synthetic.SIZES.get(s.strip().lower()) or int(s) for s in args.sizes.split(',')]
+    report = {'meta': metadata(), 'results': []}
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in sizes:
+            print(f"{rows:,} rows", flush=True)
+            for case, seconds in run_size(rows, args, workdir).items():
+                report['results'].append({'rows': rows, 'case': case, 'seconds': seconds})
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
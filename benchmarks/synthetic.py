@@ -0,0 +1,109 @@
+"""Synthetic Book1.xlsx-shaped compensation data at any size.
+
+Columns, header names and cell formatting ("$98,734,394", "1,447:1") match the
+real workbook; salaries and worker pay are log-normal so the long right tail
+(a few nine-figure packages, many single-digit millions) looks like the
+filings the dashboard is built for.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import COLUMN_MAPPING
+
+INDUSTRIES = [
+    'Information Technology', 'Financials', 'Health Care', 'Consumer Discretionary',
+    'Consumer Staples', 'Communication Services', 'Energy', 'Industrials',
+    'Materials', 'Utilities', 'Real Estate',
+]
+INDUSTRY_WEIGHTS = np.array([16, 14, 13, 11, 7, 6, 5, 13, 6, 5, 4], dtype=float)
+
+# Salary cut-offs used by the real workbook's "Pay Level" column
+PAY_LEVEL_BINS = [0, 1_000_000, 10_000_000, 50_000_000, 150_000_000, np.inf]
+PAY_LEVEL_LABELS = ['Minimal', 'Low', 'Medium', 'High', 'Extreme']
+
+FIRST_NAMES = np.array(['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda',
+                        'David', 'Susan', 'Satya', 'Andrew', 'Timothy', 'Jane', 'Sundar', 'Mark'])
+LAST_NAMES = np.array(['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+                       'Wilson', 'Moore', 'Taylor', 'Anderson', 'Thomas', 'Jackson', 'White', 'Harris'])
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+
+def _money(values):
+    return [f"${v:,}" for v in values.tolist()]
+
+
+def generate(rows, seed=0, missing_ratio=0.05):
+    """Raw frame with the workbook's headers and text formatting."""
+    rng = np.random.default_rng(seed)
+
+    industry = rng.choice(len(INDUSTRIES), size=rows, p=INDUSTRY_WEIGHTS / INDUSTRY_WEIGHTS.sum())
+    salary = np.rint(rng.lognormal(mean=np.log(15e6), sigma=1.1, size=rows)).astype(np.int64)
+    worker_pay = np.rint(rng.lognormal(mean=np.log(75e3), sigma=0.5, size=rows)).astype(np.int64)
+    ratio = np.maximum(np.rint(salary / worker_pay), 1).astype(np.int64)
+
+    ratio_text = np.array([f"{v:,}:1" for v in ratio.tolist()], dtype=object)
+    # Some filings don't disclose a pay ratio
+    ratio_text[rng.random(rows) < missing_ratio] = None
+
+    ids = np.arange(rows)
+    raw = pd.DataFrame({
+        'CEO Name': [f"{f} {l}" for f, l in zip(rng.choice(FIRST_NAMES, rows), rng.choice(LAST_NAMES, rows))],
+        'Company': [f"Company {i:07d}" for i in ids.tolist()],
+        'Ticker': [f"T{i:07X}" for i in ids.tolist()],
+        'Industry': np.array(INDUSTRIES, dtype=object)[industry],
+        'Salary': _money(salary),
+        'Pay Ratio': ratio_text,
+        'Median Worker Pay': _money(worker_pay),
+        'Market Cap (Billions)': np.rint(rng.lognormal(np.log(120), 1.2, rows)).astype(np.int64) + 1,
+        'CEO Tenure (Years)': rng.geometric(1 / 8, rows),
+        'Employees': np.rint(rng.lognormal(np.log(60_000), 1.3, rows)).astype(np.int64) + 100,
+        'Pay Level': pd.cut(salary, PAY_LEVEL_BINS, labels=PAY_LEVEL_LABELS, right=False).astype(str),
+    })
+    assert list(raw.columns) == list(COLUMN_MAPPING)
+    return raw
+
+
+def write_workbook(raw, path):
+    """Write a generated frame as an .xlsx (Excel caps a sheet at 1,048,576 rows)."""
+    raw.to_excel(path, index=False)
+    return path
+
+
+def write_source(raw, path, table='ceo_compensation'):
+    """Write a generated frame in the format implied by ``path``'s extension (see sources.EXTENSIONS)."""
+    import sources
+
+    fmt = sources.source_format(path)
+    if fmt == 'csv':
+        raw.to_csv(path, index=False)
+    elif fmt == 'parquet':
+        raw.to_parquet(path, index=False)
+    elif fmt == 'sqlite':
+        import sqlite3
+
+        conn = sqlite3.connect(path)
+        try:
+            raw.to_sql(table, conn, index=False, if_exists='replace')
+        finally:
+            conn.close()
+    else:
+        write_workbook(raw, path)
+    return path
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output', help='.xlsx, .csv, .parquet or .db (SQLite) path')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    write_source(generate(args.rows, seed=args.seed), args.output)
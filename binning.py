@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+# Grid used when a scatter has too many points to draw one marker each
+GRID_SHAPE = (60, 40)
+
+
+def _edges(values, n):
+    lo, hi = values.min(), values.max()
+    if lo == hi:
+        # A single distinct value still gets a bin of non-zero width
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, n + 1)
+
+
+def grid_bins(rows, x, y, label='CEO_Name', rank='Salary', shape=GRID_SHAPE, log_x=False):
+    """Counts of ``rows`` per cell of a regular ``x`` by ``y`` grid, one row per non-empty cell.
+
+    Each cell carries its bounds (``x0``/``x1``/``y0``/``y1``, for drilling into
+    it), the mean of both coordinates and the ``label`` of its largest ``rank``
+    row for the hover text. With ``log_x`` the x edges are spaced evenly in
+    log10 and rows with non-positive x are left out, like a log axis does.
+    """
+    xs = rows[x].to_numpy(dtype=float, na_value=np.nan)
+    ys = rows[y].to_numpy(dtype=float, na_value=np.nan)
+    if log_x:
+        xs = np.log10(np.where(xs > 0, xs, np.nan))
+    keep = np.flatnonzero(~(np.isnan(xs) | np.isnan(ys)))
+    columns = ['x', 'y', 'x0', 'x1', 'y0', 'y1', 'count', 'top_label', 'top_value']
+    if len(keep) == 0:
+        return pd.DataFrame(columns=columns)
+    xs, ys = xs[keep], ys[keep]
+
+    nx, ny = shape
+    x_edges = _edges(xs, nx)
+    y_edges = _edges(ys, ny)
+    # The top edge belongs to the last cell
+    ix = np.clip(np.searchsorted(x_edges, xs, side='right') - 1, 0, nx - 1)
+    iy = np.clip(np.searchsorted(y_edges, ys, side='right') - 1, 0, ny - 1)
+    cells, cell_of_row, counts = np.unique(ix * ny + iy, return_inverse=True, return_counts=True)
+
+    mean_x = np.bincount(cell_of_row, weights=xs) / counts
+    mean_y = np.bincount(cell_of_row, weights=ys) / counts
+
+    # Largest rank value per cell: sort by value descending, keep each cell's first row
+    ranked = rows[rank].to_numpy(dtype=float, na_value=np.nan)[keep]
+    order = np.lexsort((-np.nan_to_num(ranked, nan=-np.inf), cell_of_row))
+    first = order[np.searchsorted(cell_of_row[order], np.arange(len(cells)))]
+
+    cx, cy = cells // ny, cells % ny
+    bins = pd.DataFrame({
+        'x': mean_x,
+        'y': mean_y,
+        'x0': x_edges[cx],
+        'x1': x_edges[cx + 1],
+        'y0': y_edges[cy],
+        'y1': y_edges[cy + 1],
+        'count': counts,
+        'top_label': rows[label].to_numpy()[keep][first] if label in rows.columns else None,
+        'top_value': ranked[first],
+    })
+    if log_x:
+        for col in ('x', 'x0', 'x1'):
+            bins[col] = 10 ** bins[col]
+    return bins
+
+
+def within(rows, x, y, region):
+    """Rows whose ``x``/``y`` fall inside ``region``, a ``(x0, x1, y0, y1)`` box with inclusive bounds."""
+    x0, x1, y0, y1 = region
+    xs = rows[x]
+    ys = rows[y]
+    return rows[xs.between(x0, x1) & ys.between(y0, y1)]
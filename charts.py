@@ -0,0 +1,211 @@
+"""Plotly figures for the dashboard, built from the payloads in engine.py."""
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+import binning
+from parsers import PAY_LEVELS
+
+# Color map for pay levels
+COLOR_MAP = {
+    'Minimal': '#059669',
+    'Low': '#10b981',
+    'Medium': '#3b82f6',
+    'High': '#f59e0b',
+    'Extreme': '#ef4444'
+}
+
+
+def scatter_mode(points, webgl_points, bin_points):
+    """How to draw a scatter of ``points`` markers: 'svg', 'webgl' or 'binned' (0 disables a threshold)."""
+    if bin_points > 0 and points > bin_points:
+        return 'binned'
+    if webgl_points > 0 and points > webgl_points:
+        return 'webgl'
+    return 'svg'
+
+
+def binned_scatter(rows, x, y, title, log_x=False):
+    """One square marker per non-empty grid cell, shaded by how many rows it holds.
+
+    The cell bounds ride along in ``customdata`` so a box selection can be
+    turned back into a region of the underlying rows.
+    """
+    bins = binning.grid_bins(rows, x, y, log_x=log_x)
+    customdata = bins[['x0', 'x1', 'y0', 'y1', 'count', 'top_label', 'top_value']].to_numpy(dtype=object)
+    fig = go.Figure(go.Scatter(
+        x=bins['x'],
+        y=bins['y'],
+        mode='markers',
+        marker=dict(
+            symbol='square',
+            size=9,
+            color=np.log10(bins['count'].to_numpy(dtype=float)),
+            colorscale='Viridis',
+            colorbar=dict(title='CEOs (log10)')
+        ),
+        customdata=customdata,
+        hovertemplate=(
+            '%{customdata[4]:,} CEOs<br>'
+            + x + ': %{customdata[0]:,.4~g} to %{customdata[1]:,.4~g}<br>'
+            + y + ': %{customdata[2]:,.4~g} to %{customdata[3]:,.4~g}<br>'
+            + 'Top paid: %{customdata[5]} (%{customdata[6]:$,.0f})<extra></extra>'
+        )
+    ))
+    fig.update_layout(title=f"{title} ({len(rows):,} CEOs, binned)", dragmode='select')
+    if log_x:
+        fig.update_xaxes(type='log')
+    return fig
+
+
+def top20_bar(top20):
+    fig = px.bar(
+        top20,
+        x='Salary',
+        y='CEO_Name',
+        orientation='h',
+        color='Pay_Level',
+        color_discrete_map=COLOR_MAP,
+        title="Top 20 CEO Total Compensation",
+        hover_data={'Company': True, 'Salary': ':$,.0f'},
+        category_orders={'Pay_Level': PAY_LEVELS}
+    )
+    fig.update_layout(
+        height=600,
+        xaxis_title="Total Compensation ($)",
+        yaxis_title="CEO",
+        xaxis=dict(tickformat='$,.0f')
+    )
+    return fig
+
+
+def salary_vs_ratio(rows, render_mode='auto'):
+    if render_mode == 'binned':
+        fig = binned_scatter(rows, 'Salary', 'Pay_Ratio', "CEO Salary vs Worker Pay Ratio")
+    else:
+        fig = px.scatter(
+            rows,
+            x='Salary',
+            y='Pay_Ratio',
+            size='Employees' if 'Employees' in rows.columns else None,
+            color='Industry',
+            hover_data=['CEO_Name', 'Company'],
+            title="CEO Salary vs Worker Pay Ratio",
+            render_mode=render_mode
+        )
+    fig.update_layout(
+        height=450,
+        xaxis=dict(tickformat='$,.0f', title="CEO Salary ($)"),
+        yaxis=dict(title="Pay Ratio (CEO:Worker)")
+    )
+    return fig
+
+
+def ratio_histogram(rows):
+    fig = px.histogram(
+        rows,
+        x='Pay_Ratio',
+        nbins=20,
+        title='Distribution of CEO-to-Worker Pay Ratios'
+    )
+    fig.update_layout(
+        height=450,
+        xaxis=dict(title="Pay Ratio"),
+        yaxis=dict(title="Number of Companies")
+    )
+    return fig
+
+
+def industry_average(industry_avg):
+    fig = px.bar(
+        x=industry_avg.values,
+        y=industry_avg.index,
+        orientation='h',
+        title='Average CEO Compensation by Industry',
+        color=industry_avg.values,
+        color_continuous_scale='Viridis'
+    )
+    fig.update_layout(
+        height=500,
+        showlegend=False,
+        xaxis=dict(tickformat='$,.0f', title="Average Salary ($)"),
+        yaxis=dict(title="Industry")
+    )
+    return fig
+
+
+def pay_level_mix(level_counts):
+    fig = px.bar(
+        level_counts,
+        x='Industry',
+        y='count',
+        color='Pay_Level',
+        title='Pay Level Distribution by Industry',
+        color_discrete_map=COLOR_MAP,
+        category_orders={'Pay_Level': PAY_LEVELS}
+    )
+    fig.update_layout(
+        height=500,
+        xaxis_tickangle=-45,
+        yaxis=dict(title="Number of CEOs")
+    )
+    return fig
+
+
+def tenure_vs_salary(rows, render_mode='auto'):
+    if render_mode == 'binned':
+        fig = binned_scatter(rows, 'CEO_Tenure_Years', 'Salary', 'CEO Experience vs Compensation')
+    else:
+        fig = px.scatter(
+            rows,
+            x='CEO_Tenure_Years',
+            y='Salary',
+            size='Market_Cap_Billions' if 'Market_Cap_Billions' in rows.columns else None,
+            color='Pay_Level',
+            color_discrete_map=COLOR_MAP,
+            hover_data=['CEO_Name', 'Company'],
+            title='CEO Experience vs Compensation',
+            render_mode=render_mode
+        )
+    fig.update_layout(
+        height=450,
+        xaxis=dict(title="Years as CEO"),
+        yaxis=dict(tickformat='$,.0f', title="Total Compensation ($)")
+    )
+    return fig
+
+
+def size_vs_salary(rows, render_mode='auto'):
+    if render_mode == 'binned':
+        fig = binned_scatter(rows, 'Employees', 'Salary', 'Company Size vs CEO Pay', log_x=True)
+    else:
+        fig = px.scatter(
+            rows,
+            x='Employees',
+            y='Salary',
+            size='Market_Cap_Billions' if 'Market_Cap_Billions' in rows.columns else None,
+            color='Industry',
+            hover_data=['CEO_Name', 'Company'],
+            title='Company Size vs CEO Pay',
+            log_x=True,
+            render_mode=render_mode
+        )
+    fig.update_layout(
+        height=450,
+        xaxis=dict(title="Number of Employees (log scale)"),
+        yaxis=dict(tickformat='$,.0f', title="CEO Compensation ($)")
+    )
+    return fig
+
+
+def correlation_heatmap(corr_matrix):
+    fig = px.imshow(
+        corr_matrix,
+        text_auto='.2f',
+        title='Correlation Matrix: Pay vs Performance Metrics',
+        color_continuous_scale='RdBu',
+        zmin=-1,
+        zmax=1
+    )
+    fig.update_layout(height=500)
+    return fig
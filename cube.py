@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+# Cells of the cube and the columns aggregated in each cell
+CUBE_DIMENSIONS = ['Industry', 'Pay_Level']
+CUBE_MEASURES = ['Salary', 'Pay_Ratio']
+
+# Columns whose co-moments are kept per cell, so correlations never rescan rows
+CUBE_MOMENTS = ['Salary', 'Market_Cap_Billions', 'Employees', 'CEO_Tenure_Years', 'Pay_Ratio']
+
+
+class AggregateCube:
+    """Per-cell count, sum, min, max and non-null count for a few measures.
+
+    One row per observed (Industry, Pay_Level) combination, so a KPI for any
+    sidebar selection is combined from at most a few dozen cells instead of
+    rescanning the filtered rows. The row labels of each cell's min and max
+    are kept too, so the dashboard can still name the highest and lowest paid
+    CEO.
+
+    Each cell also keeps the sufficient statistics of the moment columns over
+    its complete rows (count, sums and cross products, taken around the global
+    mean for numerical stability), from which a Pearson matrix for any
+    selection is assembled by summing cells.
+
+    Filters the cells can't express (the numeric range sliders) are handled
+    by ``restrict``, which re-aggregates the same cells over a row mask.
+    """
+
+    def __init__(self, cells, dimensions, measures, moments=None, cell_of_row=None, rows_by_cell=None):
+        self.cells = cells
+        self.dimensions = dimensions
+        self.measures = measures
+        self.moments = moments
+        self.cell_of_row = cell_of_row
+        # Row positions grouped by cell (frame order within a cell), so restrict never sorts
+        if rows_by_cell is None and cell_of_row is not None:
+            rows_by_cell = np.argsort(cell_of_row, kind='stable')
+            if len(rows_by_cell) <= np.iinfo(np.int32).max:
+                rows_by_cell = rows_by_cell.astype(np.int32)
+        self.rows_by_cell = rows_by_cell
+        # (frame, grouped positions, cell count) a restricted cube builds its moments from on first use
+        self._moment_rows = None
+
+    @classmethod
+    def build(cls, df, dimensions=CUBE_DIMENSIONS, measures=CUBE_MEASURES, moments=CUBE_MOMENTS):
+        dimensions = [d for d in dimensions if d in df.columns]
+        measures = [m for m in measures if m in df.columns]
+        grouped = df.groupby(dimensions, observed=True, dropna=False, sort=False)
+        # Cell number of every row, in the same first-appearance order as the cells
+        cell_of_row = grouped.ngroup().to_numpy().astype(np.int32)
+
+        parts = [grouped.size().rename('rows')]
+        for m in measures:
+            parts.append(grouped[m].agg(['count', 'sum', 'min', 'max']).add_prefix(f'{m}_'))
+            # idxmin/idxmax refuse all-NaN groups, so only look at rows that have the measure
+            present = df[m].notna()
+            by_cell = df.loc[present, dimensions + [m]].groupby(dimensions, observed=True, dropna=False)[m]
+            parts.append(by_cell.idxmin().rename(f'{m}_argmin'))
+            parts.append(by_cell.idxmax().rename(f'{m}_argmax'))
+
+        cells = pd.concat(parts, axis=1).reset_index()
+        return cls(cells, dimensions, measures, _build_moments(df, moments, cell_of_row, len(cells)),
+                   cell_of_row)
+
+    def restrict(self, df, mask):
+        """The same cells aggregated over only the rows of ``df`` where ``mask`` is set.
+
+        ``df`` is the frame the cube was built from. Each row's cell is already
+        known and the rows are kept grouped by cell, so this is a few bincounts
+        and segment reductions over the masked rows rather than a new groupby.
+        Cells left empty are dropped; the rest keep their index, so the moment
+        arrays line up as before.
+        """
+        positions = self.rows_by_cell[mask[self.rows_by_cell]]
+        cell_of_row = self.cell_of_row[positions]
+        n_cells = len(self.cells)
+        labels = df.index.to_numpy()[positions]
+
+        cells = self.cells[self.dimensions].copy()
+        cells['rows'] = np.bincount(cell_of_row, minlength=n_cells)
+        for m in self.measures:
+            values = df[m].to_numpy(dtype=float, na_value=np.nan)[positions]
+            present = ~np.isnan(values)
+            in_cell, values, at = cell_of_row[present], values[present], labels[present]
+            count = np.bincount(in_cell, minlength=n_cells)
+            cells[f'{m}_count'] = count
+            cells[f'{m}_sum'] = np.bincount(in_cell, weights=values, minlength=n_cells)
+            filled = np.flatnonzero(count)
+            starts = np.cumsum(count[filled]) - count[filled]
+            for stat, reduce in (('min', np.minimum), ('max', np.maximum)):
+                best = reduce.reduceat(values, starts) if len(values) else values
+                # First row of each cell holding its extreme, like idxmin/idxmax
+                hits = np.flatnonzero(values == np.repeat(best, count[filled]))
+                first = hits[np.r_[True, in_cell[hits][1:] != in_cell[hits][:-1]]] if len(hits) else hits
+                cells[f'{m}_{stat}'] = pd.Series(best, index=filled).reindex(cells.index)
+                cells[f'{m}_arg{stat}'] = pd.Series(at[first], index=filled).reindex(cells.index)
+
+        restricted = AggregateCube(cells[cells['rows'] > 0], self.dimensions, self.measures, None,
+                                   self.cell_of_row, self.rows_by_cell)
+        if self.moments is not None:
+            # Only the correlation matrix needs the moments, so they are built on first use
+            restricted._moment_rows = (df[self.moments['columns']], positions, n_cells)
+        return restricted
+
+    def select(self, selections):
+        """Cells matching a sidebar selection (empty selections leave a dimension unfiltered)."""
+        keep = np.ones(len(self.cells), dtype=bool)
+        for dim, selected in selections.items():
+            if selected and dim in self.dimensions:
+                keep &= self.cells[dim].isin(selected).to_numpy()
+        return self.cells[keep]
+
+    def group(self, dimension, selections):
+        """Per-value stats along one dimension for a selection, in one pass over the cells.
+
+        Returns a frame indexed by the dimension's values (in order of first
+        appearance in the data) with ``rows`` and, per measure, ``<m>_count``,
+        ``_sum``, ``_mean``, ``_min`` and ``_max``.
+        """
+        cells = self.select(selections)
+        stats = ['count', 'sum', 'min', 'max']
+        columns = ['rows'] + [f'{m}_{stat}' for m in self.measures for stat in stats]
+        grouped = cells.groupby(dimension, observed=True, sort=False)[columns].agg(
+            {c: ('min' if c.endswith('_min') else 'max' if c.endswith('_max') else 'sum')
+             for c in columns}
+        )
+        for m in self.measures:
+            grouped[f'{m}_mean'] = grouped[f'{m}_sum'] / grouped[f'{m}_count'].where(grouped[f'{m}_count'] > 0)
+        return grouped
+
+    def correlation(self, selections):
+        """Pearson matrix of the moment columns over the selection's complete rows.
+
+        Same result as ``rows[columns].dropna().corr()``; None with fewer than
+        two complete rows or moment columns.
+        """
+        if self._moment_rows is not None:
+            frame, positions, n_cells = self._moment_rows
+            self.moments = _build_moments(frame.iloc[positions], list(frame.columns),
+                                          self.cell_of_row[positions], n_cells)
+            self._moment_rows = None
+        if self.moments is None:
+            return None
+        keep = self.select(selections).index.to_numpy()
+        n = self.moments['n'][keep].sum()
+        if n < 2:
+            return None
+        sums = self.moments['sums'][keep].sum(axis=0)
+        cross = self.moments['cross'][keep].sum(axis=0)
+
+        cov = cross - np.outer(sums, sums) / n
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        np.clip(corr, -1, 1, out=corr)
+        columns = self.moments['columns']
+        return pd.DataFrame(corr, index=columns, columns=columns)
+
+    def summary(self, selections):
+        """Combine the selected cells into row count, distinct industries and per-measure stats.
+
+        Each measure contributes ``<m>_count``, ``_sum``, ``_mean``, ``_min``,
+        ``_max`` and the row labels ``_argmin``/``_argmax`` (first row in frame
+        order on ties, like ``idxmin``). Stats of a measure with no values are NaN.
+        """
+        cells = self.select(selections)
+        result = {'rows': int(cells['rows'].sum())}
+        if 'Industry' in self.dimensions:
+            result['industries'] = int(cells['Industry'].nunique())
+
+        for m in self.measures:
+            count = int(cells[f'{m}_count'].sum())
+            total = float(cells[f'{m}_sum'].sum())
+            result[f'{m}_count'] = count
+            result[f'{m}_sum'] = total
+            result[f'{m}_mean'] = total / count if count else np.nan
+            for stat, pick in (('min', np.nanmin), ('max', np.nanmax)):
+                if not count:
+                    result[f'{m}_{stat}'] = np.nan
+                    result[f'{m}_arg{stat}'] = None
+                    continue
+                values = cells[f'{m}_{stat}']
+                best = pick(values.to_numpy(dtype=float))
+                result[f'{m}_{stat}'] = best
+                result[f'{m}_arg{stat}'] = cells.loc[values == best, f'{m}_arg{stat}'].min()
+        return result
+
+
+def _build_moments(df, columns, cell_of_row, n_cells):
+    """Per-cell count, sums and cross products of ``columns`` over complete rows."""
+    columns = [c for c in (columns or []) if c in df.columns]
+    if len(columns) < 2:
+        return None
+
+    values = df[columns].to_numpy(dtype=float, na_value=np.nan)
+    complete = ~np.isnan(values).any(axis=1)
+    values = values[complete]
+    cells = cell_of_row[complete]
+    # Shifting by the global mean leaves correlations unchanged but keeps the sums small
+    if len(values):
+        values = values - values.mean(axis=0)
+
+    # Group the rows by cell (restrict passes them grouped already) and reduce each block
+    if (np.diff(cells) < 0).any():
+        order = np.argsort(cells, kind='stable')
+        values, cells = values[order], cells[order]
+    bounds = np.searchsorted(cells, np.arange(n_cells + 1))
+
+    p = len(columns)
+    n = np.diff(bounds).astype(float)
+    sums = np.zeros((n_cells, p))
+    cross = np.zeros((n_cells, p, p))
+    for cell in np.flatnonzero(n):
+        block = values[bounds[cell]:bounds[cell + 1]]
+        sums[cell] = block.sum(axis=0)
+        cross[cell] = block.T @ block
+    return {'columns': columns, 'n': n, 'sums': sums, 'cross': cross}
@@ -1,8 +1,19 @@
+import math
+import os
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
+
+import binning
+import charts
+import engine
+import sources
+from cube import AggregateCube
+from figcache import FigureCache
+from filters import FilterIndex, SortedIndex
+from ranking import TopKIndex
+from search import SearchIndex
+from timing import RerunTimer
 
 # Page config
 st.set_page_config(
@@ -15,527 +26,538 @@ st.set_page_config(
 st.title("💰 CEO Compensation Dashboard: The Pay Gap Story")
 st.markdown("### Analyzing Fortune 500 CEO compensation across industries")
 
+# Data source and its format (excel, csv, parquet or sqlite; empty means follow the file extension)
+DATA_FILE = os.environ.get('CEO_DASHBOARD_DATA_FILE', engine.DATA_FILE)
+DATA_FORMAT = os.environ.get('CEO_DASHBOARD_DATA_FORMAT', '')
+
+# Stream Excel sources in chunks of this many rows to bound peak memory while loading (0 reads the sheet whole)
+INGEST_CHUNK_ROWS = int(os.environ.get('CEO_DASHBOARD_INGEST_CHUNK_ROWS', '0'))
+
+# Back the shared dataset with the memory-mapped snapshot instead of a private copy per process
+SHARED_DATASET = os.environ.get('CEO_DASHBOARD_SHARED_DATASET', '0') == '1'
+
+# Only run the selected tab's computations on each rerun
+LAZY_TABS = os.environ.get('CEO_DASHBOARD_LAZY_TABS', '1') == '1'
+
+# Memory budget for serialized figures shared by all sessions (0 disables the cache)
+FIGURE_CACHE_MB = float(os.environ.get('CEO_DASHBOARD_FIGURE_CACHE_MB', '64'))
+
+# Scatters switch to WebGL above the first point count and to server-side grid bins above the second (0 disables either)
+SCATTER_WEBGL_POINTS = int(os.environ.get('CEO_DASHBOARD_SCATTER_WEBGL_POINTS', '1000'))
+SCATTER_BIN_POINTS = int(os.environ.get('CEO_DASHBOARD_SCATTER_BIN_POINTS', '100000'))
+
+# Per-rerun section timings: JSON-lines log (off unless a path is given; it grows with every rerun)
+# and the sidebar breakdown toggle
+TIMING_LOG = os.environ.get('CEO_DASHBOARD_TIMING_LOG', '')
+ADMIN_MODE = os.environ.get('CEO_DASHBOARD_ADMIN', '0') == '1'
+
+timer = RerunTimer()
+
+# Tables ship raw numbers (salaries in $M) and the browser formats them
+MILLIONS = st.column_config.NumberColumn(format="$%.1fM")
+RATIO = st.column_config.NumberColumn(format="%.0f:1")
+TABLE_COLUMNS = {
+    'Number of CEOs': st.column_config.NumberColumn(format="%d"),
+    'Avg CEO Pay': MILLIONS,
+    'Max CEO Pay': MILLIONS,
+    'Min CEO Pay': MILLIONS,
+    'Avg Pay Ratio': RATIO,
+    'Max Pay Ratio': RATIO,
+    'Salary': MILLIONS,
+    'Pay Ratio': RATIO,
+}
+
+# Range sliders: label and display format per column
+RANGE_SLIDERS = {
+    'Salary': ("Salary ($)", 'compact'),
+    'Market_Cap_Billions': ("Market Cap ($B)", '%,d'),
+    'CEO_Tenure_Years': ("CEO Tenure (years)", '%d'),
+    'Employees': ("Employees", 'compact'),
+    'Pay_Ratio': ("Pay Ratio (CEO:Worker)", '%,d:1'),
+}
+
 # Load your data with proper handling
-@st.cache_data
+@st.cache_resource
 def load_data():
+    # One read-only frame per process, handed to every session and rerun without copying it
     try:
-        # Read Excel file
-        df = pd.read_excel('Book1.xlsx')
-        
-        # Clean column names - remove any extra spaces
-        df.columns = df.columns.str.strip()
-        
-        # Create exact column mapping for your data
-        column_mapping = {
-            'CEO Name': 'CEO_Name',
-            'Company': 'Company',
-            'Ticker': 'Ticker',
-            'Industry': 'Industry',
-            'Salary': 'Salary',
-            'Pay Ratio': 'Pay_Ratio',
-            'Median Worker Pay': 'Median_Worker_Pay',
-            'Market Cap (Billions)': 'Market_Cap_Billions',
-            'CEO Tenure (Years)': 'CEO_Tenure_Years',
-            'Employees': 'Employees',
-            'Pay Level': 'Pay_Level'
-        }
-        
-        # Rename columns
-        df = df.rename(columns=column_mapping)
-        
-        # Convert numeric columns
-        numeric_columns = ['Salary', 'Pay_Ratio', 'Market_Cap_Billions', 'CEO_Tenure_Years', 'Employees', 'Median_Worker_Pay']
-        
-        for col in numeric_columns:
-            if col in df.columns:
-                if col == 'Pay_Ratio':
-                    # Special handling for pay ratio - it's in format "1,447:1"
-                    df[col] = df[col].astype(str).str.replace(',', '')
-                    df[col] = df[col].str.split(':').str[0]
-                elif col in ['Salary', 'Median_Worker_Pay']:
-                    # Remove dollar and commas from salary columns
-                    df[col] = df[col].astype(str).str.replace('$', '', regex=False).str.replace(',', '')
-                else:
-                    # For other numeric columns, just remove commas
-                    df[col] = df[col].astype(str).str.replace(',', '')
-                
-                # Convert to numeric
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # Clean string columns
-        string_columns = ['CEO_Name', 'Company', 'Industry', 'Pay_Level']
-        for col in string_columns:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.strip()
-        
-        # Ensure Pay_Level is a category type with the correct order
-        if 'Pay_Level' in df.columns:
-            df['Pay_Level'] = pd.Categorical(df['Pay_Level'], 
-                                             categories=['Minimal', 'Low', 'Medium', 'High', 'Extreme'], 
-                                             ordered=True)
-        
-        # Remove any rows with missing critical data
-        df = df.dropna(subset=['CEO_Name', 'Salary'])
-        
-        return df
-        
+        return engine.freeze(engine.load_frame(DATA_FILE, DATA_FORMAT, INGEST_CHUNK_ROWS))
     except Exception as e:
         st.error(f"Error in load_data: {str(e)}")
         raise e
 
+@st.cache_resource
+def load_shared_data():
+    # Same, but backed by the snapshot file in the page cache so worker processes share it too
+    try:
+        return engine.freeze(engine.map_frame(DATA_FILE, DATA_FORMAT, INGEST_CHUNK_ROWS))
+    except Exception as e:
+        st.error(f"Error in load_shared_data: {str(e)}")
+        raise e
+
+def build_index(name, build, df):
+    # In shared mode the index is saved next to the snapshot and mapped, so worker processes share it too
+    return engine.map_index(name, build, df, DATA_FILE) if SHARED_DATASET else build(df)
+
+@st.cache_resource
+def load_filter_index(_df, digest):
+    # Per-value bitmaps for the sidebar filters, built once per dataset version
+    return build_index('filter', lambda df: FilterIndex.build(df, engine.FILTER_COLUMNS), _df)
+
+@st.cache_resource
+def load_cube(_df, digest):
+    # Industry x Pay_Level aggregates (and co-moments) that the KPIs and correlations are combined from
+    return build_index('cube', AggregateCube.build, _df)
+
+@st.cache_resource
+def load_ranking(_df, digest):
+    # Salary-sorted row order, overall and per industry, for the top-K tables
+    return build_index('ranking', lambda df: TopKIndex.build(df, engine.RANK_COLUMN, group_by=engine.RANK_GROUP), _df)
+
+@st.cache_resource
+def load_sorted_index(_df, digest):
+    # Sorted row positions per range-slider column, so each range is a binary search
+    return build_index('sorted', lambda df: SortedIndex.build(df, engine.RANGE_COLUMNS), _df)
+
+@st.cache_resource
+def load_search_index(_df, digest):
+    # Word, prefix and trigram postings over names, companies and tickers for the CEO search box
+    return build_index('search', lambda df: SearchIndex.build(df, engine.SEARCH_COLUMNS), _df)
+
+@st.cache_resource
+def load_dataset(_df, digest):
+    # One Dataset per dataset version, so what it memoizes (e.g. present()'s masks) outlives a rerun
+    return engine.Dataset(
+        _df,
+        filter_index=load_filter_index(_df, digest),
+        cube=load_cube(_df, digest),
+        ranking=load_ranking(_df, digest),
+        sorted_index=load_sorted_index(_df, digest),
+        search_index=load_search_index(_df, digest)
+    )
+
+@st.cache_resource
+def load_figure_cache():
+    return FigureCache(int(FIGURE_CACHE_MB * 2**20))
+
+@st.cache_data(max_entries=256)
+def industry_table(_selection, digest, filter_key):
+    # Per-industry stats for one filter state, grouped from the cube cells in one pass
+    grouped = engine.industry_stats(_selection)
+    
+    industry_stats = pd.DataFrame({
+        'Industry': grouped.index,
+        'Number of CEOs': grouped['rows'].to_numpy(dtype=int),
+        'Avg CEO Pay': grouped['Salary_mean'].to_numpy() / 1000000,
+        'Max CEO Pay': grouped['Salary_max'].to_numpy() / 1000000,
+        'Min CEO Pay': grouped['Salary_min'].to_numpy() / 1000000
+    })
+    
+    # Industries without any disclosed ratio are left blank
+    if 'Pay_Ratio_count' in grouped.columns and (grouped['Pay_Ratio_count'] > 0).any():
+        industry_stats['Avg Pay Ratio'] = grouped['Pay_Ratio_mean'].to_numpy()
+        industry_stats['Max Pay Ratio'] = grouped['Pay_Ratio_max'].to_numpy()
+    return industry_stats
+
 # Load the data
-try:
-    df = load_data()
-    data_loaded = True
-except Exception as e:
-    st.error(f"Error loading data: {str(e)}")
-    st.error("Please ensure 'Book1.xlsx' is in the correct format.")
-    st.stop()
+with timer.section('load_data'):
+    try:
+        df = load_shared_data() if SHARED_DATASET else load_data()
+        data_loaded = True
+    except Exception as e:
+        st.error(f"Error loading data: {str(e)}")
+        try:
+            fmt = sources.source_format(DATA_FILE, DATA_FORMAT or None)
+            source = f"a valid {fmt} source" + (f" with a '{sources.SQLITE_TABLE}' table" if fmt == 'sqlite' else '')
+        except ValueError:
+            source = f"a supported source ({', '.join(sources.READERS)})"
+        st.error(f"Please ensure '{DATA_FILE}' is {source} "
+                 f"(set CEO_DASHBOARD_DATA_FORMAT when the file extension doesn't give the format).")
+        st.stop()
+
+with timer.section('load_indexes', rows=len(df)):
+    dataset = load_dataset(df, df.attrs.get('digest'))
 
 # Sidebar with filters
+filter_options = dataset.filter_options()
+filter_selections = {}
+
+# Whole-number slider bounds per range column; a column with a single value gets no slider
+range_bounds = {}
+for col, (low, high) in dataset.range_options().items():
+    if math.floor(low) != math.ceil(high):
+        range_bounds[col] = (math.floor(low), math.ceil(high))
+
+def active_ranges(values):
+    # A slider left at its full extent doesn't filter, so rows missing that value stay in
+    return {col: tuple(values[col]) for col, bounds in range_bounds.items() if tuple(values[col]) != bounds}
+
+# Rows each option would match given the other filters, from this rerun's widget values
+with timer.section('facet_counts', rows=len(df)):
+    facet_counts = dataset.facet_counts(
+        {col: st.session_state.get(f'filter.{col}', options) for col, options in filter_options.items()},
+        active_ranges({col: st.session_state.get(f'range.{col}', bounds) for col, bounds in range_bounds.items()})
+    )
+
+def with_count(col):
+    return lambda value: f"{value} ({facet_counts[col].get(value, 0):,})"
+
 with st.sidebar:
     st.header("🔍 Filters")
     
     # Industry filter
-    if 'Industry' in df.columns:
-        industries = sorted([ind for ind in df['Industry'].unique() if ind and ind != 'nan'])
+    if 'Industry' in filter_options:
+        industries = filter_options['Industry']
         selected_industries = st.multiselect(
             "Select Industries",
             options=industries,
-            default=industries
+            default=industries,
+            format_func=with_count('Industry'),
+            key='filter.Industry'
         )
-        if selected_industries:
-            df_filtered = df[df['Industry'].isin(selected_industries)]
-        else:
-            df_filtered = df.copy()
-    else:
-        df_filtered = df.copy()
+        filter_selections['Industry'] = selected_industries
     
     # Pay level filter
-    if 'Pay_Level' in df.columns:
-        pay_levels = [level for level in ['Minimal', 'Low', 'Medium', 'High', 'Extreme'] 
-                     if level in df['Pay_Level'].cat.categories]
+    if 'Pay_Level' in filter_options:
+        pay_levels = filter_options['Pay_Level']
         selected_pay_levels = st.multiselect(
             "Select Pay Levels",
             options=pay_levels,
-            default=pay_levels
+            default=pay_levels,
+            format_func=with_count('Pay_Level'),
+            key='filter.Pay_Level'
         )
-        if selected_pay_levels:
-            df_filtered = df_filtered[df_filtered['Pay_Level'].isin(selected_pay_levels)]
+        filter_selections['Pay_Level'] = selected_pay_levels
+    
+    # Range sliders
+    range_values = {}
+    for col, (low, high) in range_bounds.items():
+        label, number_format = RANGE_SLIDERS[col]
+        range_values[col] = st.slider(label, min_value=low, max_value=high, value=(low, high),
+                                      format=number_format, key=f'range.{col}')
+    range_selections = active_ranges(range_values)
+    
+    with timer.section('sidebar_filter', rows=len(df)):
+        selection = dataset.select(filter_selections, range_selections)
+    
+    # Headline numbers for the selection, combined from the cube's cells
+    with timer.section('kpis', rows=len(selection)):
+        kpis = selection.kpis
     
     st.markdown("---")
     st.markdown("### 📊 Data Summary")
-    st.write(f"Total CEOs: {len(df_filtered)}")
-    if len(df_filtered) > 0:
-        st.write(f"Avg Salary: ${df_filtered['Salary'].mean()/1000000:.1f}M")
-
-# Color map for pay levels
-color_map = {
-    'Minimal': '#059669',
-    'Low': '#10b981', 
-    'Medium': '#3b82f6',
-    'High': '#f59e0b',
-    'Extreme': '#ef4444'
-}
+    st.write(f"Total CEOs: {kpis['rows']}")
+    if kpis['rows'] > 0:
+        st.write(f"Avg Salary: ${kpis['Salary_mean']/1000000:.1f}M")
+
+filter_key = selection.key
 
 # Create tabs
-tab1, tab2, tab3, tab4 = st.tabs(["📊 Executive Summary", "📈 Inequality Analysis", "🏭 Industry Insights", "❓ Performance Question"])
+tab_labels = ["📊 Executive Summary", "📈 Inequality Analysis", "🏭 Industry Insights", "❓ Performance Question"]
+if LAZY_TABS:
+    # Switching tabs reruns the script, so only the selected tab's charts are built
+    tab1, tab2, tab3, tab4 = st.tabs(tab_labels, key='active_tab', on_change='rerun')
+else:
+    tab1, tab2, tab3, tab4 = st.tabs(tab_labels)
 
-# TAB 1: Executive Summary
-with tab1:
-    st.header("Executive Summary: The Shocking Truth")
+def is_open(tab):
+    # Tabs that don't track state report None, in which case every tab is rendered
+    return tab.open is not False
+
+figure_cache = load_figure_cache()
+
+def cached_figure(chart_id, build):
+    # Same chart, dataset and filters as any earlier rerun in this process: skip building it
+    return figure_cache.get_or_build((chart_id, dataset.digest, filter_key), build)
+
+def show_figure(chart_id, build, **chart_args):
+    with timer.section(f'figure.{chart_id}', rows=len(selection)):
+        fig = cached_figure(chart_id, build)
+    with timer.section(f'plotly_chart.{chart_id}', rows=len(selection)):
+        return st.plotly_chart(fig, use_container_width=True, **chart_args)
+
+def selected_region(event):
+    # Bounding box of the grid cells picked with a box selection, from their customdata
+    points = event.selection.points if event else []
+    cells = [point['customdata'] for point in points if point.get('customdata')]
+    if not cells:
+        return None
+    return (min(c[0] for c in cells), max(c[1] for c in cells),
+            min(c[2] for c in cells), max(c[3] for c in cells))
+
+def show_scatter(chart_id, rows, build, x, y, region=None):
+    # Small scatters stay SVG, large ones go WebGL, and beyond that only grid counts are shipped
+    mode = charts.scatter_mode(len(rows), SCATTER_WEBGL_POINTS, SCATTER_BIN_POINTS)
+    figure_id = chart_id if region is None else f'{chart_id}@{region}'
+    if mode != 'binned':
+        show_figure(figure_id, lambda: build(rows, render_mode=mode))
+        return
     
-    if len(df_filtered) > 0:
-        # Calculate KPIs
-        max_salary = df_filtered['Salary'].max()
-        min_salary = df_filtered['Salary'].min()
-        pay_gap = max_salary / min_salary if min_salary > 0 else 0
-        avg_salary = df_filtered['Salary'].mean()
-        
-        # Pay ratio stats
-        if 'Pay_Ratio' in df_filtered.columns:
-            valid_ratios = df_filtered['Pay_Ratio'].dropna()
-            if len(valid_ratios) > 0:
-                max_ratio = valid_ratios.max()
-                min_ratio = valid_ratios.min()
-                ratio_gap = max_ratio / min_ratio if min_ratio > 0 else 0
-            else:
-                max_ratio = min_ratio = ratio_gap = 0
-        else:
-            max_ratio = min_ratio = ratio_gap = 0
-            
-        num_industries = df_filtered['Industry'].nunique()
-        
-        # Display KPIs
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric(
-                label="CEO Pay Gap",
-                value=f"{pay_gap:.0f}x",
-                delta="Highest to Lowest"
-            )
-        
-        with col2:
-            st.metric(
-                label="Average CEO Pay",
-                value=f"${avg_salary/1000000:.1f}M",
-                delta=f"Across {len(df_filtered)} CEOs"
-            )
-        
-        with col3:
-            st.metric(
-                label="Pay Ratio Gap",
-                value=f"{ratio_gap:.0f}x" if ratio_gap > 0 else "N/A",
-                delta=f"{min_ratio:.0f}:1 to {max_ratio:.0f}:1" if min_ratio > 0 else "N/A"
-            )
-        
-        with col4:
-            st.metric(
-                label="Industries",
-                value=num_industries,
-                delta="Diverse sectors"
-            )
-        
-        # CEO Salary Bar Chart
-        st.subheader("CEO Compensation Ranking")
-        
-        # Sort by salary and take top 20
-        df_chart = df_filtered.nlargest(20, 'Salary')[['CEO_Name', 'Company', 'Salary', 'Pay_Level']]
-        df_chart = df_chart.sort_values('Salary', ascending=True)
-        
-        fig_bar = px.bar(
-            df_chart, 
-            x='Salary', 
-            y='CEO_Name',
-            orientation='h',
-            color='Pay_Level',
-            color_discrete_map=color_map,
-            title="Top 20 CEO Total Compensation",
-            hover_data={'Company': True, 'Salary': ':$,.0f'},
-            category_orders={'Pay_Level': ['Minimal', 'Low', 'Medium', 'High', 'Extreme']}
-        )
-        
-        fig_bar.update_layout(
-            height=600,
-            xaxis_title="Total Compensation ($)",
-            yaxis_title="CEO",
-            xaxis=dict(tickformat='$,.0f')
-        )
-        
-        st.plotly_chart(fig_bar, use_container_width=True)
+    event = show_figure(figure_id, lambda: build(rows, render_mode=mode),
+                        on_select='rerun', selection_mode='box', key=f'select.{figure_id}')
+    region = selected_region(event)
+    if region is not None:
+        # Drill into the selected cells; this scatter bins again if it is still too large
+        drilled = binning.within(rows, x, y, region)
+        st.caption(f"Selected region: {len(drilled):,} CEOs")
+        show_scatter(chart_id, drilled, build, x, y, region)
+
+@st.fragment
+def top_ceos_by_industry(selection, valid_industries):
+    # Picking another industry reruns only this fragment, not the whole page
+    industry_selection = st.selectbox("Select an industry:", valid_industries)
+    
+    industry_data = engine.top_earners(selection, industry_selection)
+    
+    if len(industry_data) > 0:
+        display_data = industry_data[['CEO_Name', 'Company']].assign(Salary=industry_data['Salary'] / 1000000)
         
-        # Insight box
-        highest_paid = df_filtered.loc[df_filtered['Salary'].idxmax()]
-        lowest_paid = df_filtered.loc[df_filtered['Salary'].idxmin()]
+        if 'Pay_Ratio' in industry_data.columns:
+            display_data['Pay Ratio'] = industry_data['Pay_Ratio']
         
-        st.info(f"💡 **Key Insight:** {highest_paid['CEO_Name']} earns {pay_gap:.0f}x more than {lowest_paid['CEO_Name']}!")
+        st.dataframe(display_data, use_container_width=True, hide_index=True, column_config=TABLE_COLUMNS)
+
+@st.fragment
+def find_ceo(selection, filter_key):
+    # Typing a query reruns only this fragment; matching is done on the prebuilt search index
+    query = st.text_input("Search by CEO name, company or ticker:", placeholder="e.g. cook, apple, AAPL")
+    if not query.strip():
+        return
+    
+    # A fragment rerun has its own timer: the full run's timings were written when that run ended
+    search_timer = RerunTimer()
+    with search_timer.section('search', rows=len(selection)):
+        results = engine.search_ceos(selection, query)
+    search_timer.write(TIMING_LOG, filter_key)
+    
+    if len(results) > 0:
+        display_data = results.rename(columns={'Pay_Ratio': 'Pay Ratio'}).assign(Salary=results['Salary'] / 1000000)
+        st.dataframe(display_data, use_container_width=True, hide_index=True, column_config=TABLE_COLUMNS)
     else:
-        st.warning("No data available with current filters.")
+        st.info(f"No CEOs under the current filters match \"{query}\".")
+
+# TAB 1: Executive Summary
+with tab1, timer.section('tab1', rows=len(selection)):
+    if is_open(tab1):
+        st.header("Executive Summary: The Shocking Truth")
+        
+        if len(selection) > 0:
+            summary = engine.executive_summary(selection)
+            pay_gap = summary['pay_gap']
+            min_ratio = summary['min_ratio']
+            max_ratio = summary['max_ratio']
+            ratio_gap = summary['ratio_gap']
+            
+            # Display KPIs
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric(
+                    label="CEO Pay Gap",
+                    value=f"{pay_gap:.0f}x",
+                    delta="Highest to Lowest"
+                )
+            
+            with col2:
+                st.metric(
+                    label="Average CEO Pay",
+                    value=f"${summary['avg_salary']/1000000:.1f}M",
+                    delta=f"Across {summary['rows']} CEOs"
+                )
+            
+            with col3:
+                st.metric(
+                    label="Pay Ratio Gap",
+                    value=f"{ratio_gap:.0f}x" if ratio_gap > 0 else "N/A",
+                    delta=f"{min_ratio:.0f}:1 to {max_ratio:.0f}:1" if min_ratio > 0 else "N/A"
+                )
+            
+            with col4:
+                st.metric(
+                    label="Industries",
+                    value=summary['industries'],
+                    delta="Diverse sectors"
+                )
+            
+            # CEO Salary Bar Chart
+            st.subheader("CEO Compensation Ranking")
+            show_figure('top20_bar', lambda: charts.top20_bar(summary['top20']))
+            
+            # Insight box
+            highest_paid = summary['highest_paid']
+            lowest_paid = summary['lowest_paid']
+            
+            st.info(f"💡 **Key Insight:** {highest_paid['CEO_Name']} earns {pay_gap:.0f}x more than {lowest_paid['CEO_Name']}!")
+        else:
+            st.warning("No data available with current filters.")
 
 # TAB 2: Inequality Analysis
-with tab2:
-    st.header("The Inequality Story")
-    
-    if len(df_filtered) > 0:
-        col1, col2 = st.columns(2)
+with tab2, timer.section('tab2', rows=len(selection)):
+    if is_open(tab2):
+        st.header("The Inequality Story")
         
-        with col1:
-            # Scatter plot: Salary vs Pay Ratio
-            if 'Pay_Ratio' in df_filtered.columns:
-                df_scatter = df_filtered[df_filtered['Pay_Ratio'].notna()]
-                
-                if len(df_scatter) > 0:
-                    fig_scatter = px.scatter(
-                        df_scatter,
-                        x='Salary',
-                        y='Pay_Ratio',
-                        size='Employees' if 'Employees' in df_scatter.columns else None,
-                        color='Industry',
-                        hover_data=['CEO_Name', 'Company'],
-                        title="CEO Salary vs Worker Pay Ratio"
-                    )
-                    
-                    fig_scatter.update_layout(
-                        height=450,
-                        xaxis=dict(tickformat='$,.0f', title="CEO Salary ($)"),
-                        yaxis=dict(title="Pay Ratio (CEO:Worker)")
-                    )
-                    
-                    st.plotly_chart(fig_scatter, use_container_width=True)
+        if len(selection) > 0:
+            df_ratios = engine.ratio_rows(selection)
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Scatter plot: Salary vs Pay Ratio
+                if df_ratios is None:
+                    st.info("Pay ratio data not available")
+                elif len(df_ratios) > 0:
+                    show_scatter('scatter', df_ratios, charts.salary_vs_ratio, 'Salary', 'Pay_Ratio')
                 else:
                     st.info("No valid pay ratio data available")
-            else:
-                st.info("Pay ratio data not available")
-        
-        with col2:
-            # Distribution of pay ratios
-            if 'Pay_Ratio' in df_filtered.columns:
-                df_hist = df_filtered[df_filtered['Pay_Ratio'].notna()]
-                
-                if len(df_hist) > 0:
-                    fig_hist = px.histogram(
-                        df_hist,
-                        x='Pay_Ratio',
-                        nbins=20,
-                        title='Distribution of CEO-to-Worker Pay Ratios'
-                    )
-                    
-                    fig_hist.update_layout(
-                        height=450,
-                        xaxis=dict(title="Pay Ratio"),
-                        yaxis=dict(title="Number of Companies")
-                    )
-                    
-                    st.plotly_chart(fig_hist, use_container_width=True)
-        
-        # Industry comparison table
-        if 'Industry' in df_filtered.columns:
-            st.subheader("Pay Inequality by Industry")
             
-            industry_stats = []
-            for industry in df_filtered['Industry'].unique():
-                if industry and industry != 'nan':
-                    ind_data = df_filtered[df_filtered['Industry'] == industry]
-                    
-                    stats = {
-                        'Industry': industry,
-                        'Number of CEOs': len(ind_data),
-                        'Avg CEO Pay': f"${ind_data['Salary'].mean()/1000000:.1f}M",
-                        'Max CEO Pay': f"${ind_data['Salary'].max()/1000000:.1f}M",
-                        'Min CEO Pay': f"${ind_data['Salary'].min()/1000000:.1f}M"
-                    }
-                    
-                    if 'Pay_Ratio' in ind_data.columns:
-                        valid_ratios = ind_data['Pay_Ratio'].dropna()
-                        if len(valid_ratios) > 0:
-                            stats['Avg Pay Ratio'] = f"{valid_ratios.mean():.0f}:1"
-                            stats['Max Pay Ratio'] = f"{valid_ratios.max():.0f}:1"
-                    
-                    industry_stats.append(stats)
+            with col2:
+                # Distribution of pay ratios
+                if df_ratios is not None and len(df_ratios) > 0:
+                    show_figure('hist', lambda: charts.ratio_histogram(df_ratios))
             
-            if industry_stats:
-                st.dataframe(pd.DataFrame(industry_stats), use_container_width=True, hide_index=True)
-    else:
-        st.warning("No data available with current filters.")
-
-# TAB 3: Industry Insights
-with tab3:
-    st.header("Industry Deep Dive")
-    
-    if len(df_filtered) > 0:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Industry averages bar chart
-            if 'Industry' in df_filtered.columns:
-                industry_avg = df_filtered.groupby('Industry')['Salary'].mean().sort_values(ascending=True)
-                industry_avg = industry_avg[industry_avg.index != 'nan']
+            # Industry comparison table
+            if 'Industry' in selection.columns:
+                st.subheader("Pay Inequality by Industry")
                 
-                if len(industry_avg) > 0:
-                    fig_industry = px.bar(
-                        x=industry_avg.values,
-                        y=industry_avg.index,
-                        orientation='h',
-                        title='Average CEO Compensation by Industry',
-                        color=industry_avg.values,
-                        color_continuous_scale='Viridis'
-                    )
-                    
-                    fig_industry.update_layout(
-                        height=500, 
-                        showlegend=False,
-                        xaxis=dict(tickformat='$,.0f', title="Average Salary ($)"),
-                        yaxis=dict(title="Industry")
-                    )
-                    
-                    st.plotly_chart(fig_industry, use_container_width=True)
-        
-        with col2:
-            # Pay level distribution by industry
-            if 'Pay_Level' in df_filtered.columns and 'Industry' in df_filtered.columns:
-                df_stack = df_filtered[df_filtered['Industry'] != 'nan']
+                with timer.section('tab2.industry_table', rows=len(selection)):
+                    industry_stats = industry_table(selection, dataset.digest, filter_key)
                 
-                if len(df_stack) > 0:
-                    pay_level_counts = df_stack.groupby(['Industry', 'Pay_Level']).size().reset_index(name='count')
-                    
-                    fig_stacked = px.bar(
-                        pay_level_counts,
-                        x='Industry',
-                        y='count',
-                        color='Pay_Level',
-                        title='Pay Level Distribution by Industry',
-                        color_discrete_map=color_map,
-                        category_orders={'Pay_Level': ['Minimal', 'Low', 'Medium', 'High', 'Extreme']}
-                    )
-                    
-                    fig_stacked.update_layout(
-                        height=500, 
-                        xaxis_tickangle=-45,
-                        yaxis=dict(title="Number of CEOs")
-                    )
-                    
-                    st.plotly_chart(fig_stacked, use_container_width=True)
-        
-        # Top companies by industry
-        st.subheader("Top Paid CEOs by Industry")
+                if len(industry_stats) > 0:
+                    st.dataframe(industry_stats, use_container_width=True, hide_index=True, column_config=TABLE_COLUMNS)
+        else:
+            st.warning("No data available with current filters.")
+
+# TAB 3: Industry Insights
+with tab3, timer.section('tab3', rows=len(selection)):
+    if is_open(tab3):
+        st.header("Industry Deep Dive")
         
-        if 'Industry' in df_filtered.columns:
-            valid_industries = sorted([ind for ind in df_filtered['Industry'].unique() if ind and ind != 'nan'])
+        if len(selection) > 0:
+            insights = engine.industry_insights(selection)
+            col1, col2 = st.columns(2)
             
-            if valid_industries:
-                industry_selection = st.selectbox("Select an industry:", valid_industries)
-                
-                industry_data = df_filtered[df_filtered['Industry'] == industry_selection].nlargest(10, 'Salary')
+            with col1:
+                # Industry averages bar chart
+                industry_avg = insights['industry_avg']
+                if industry_avg is not None and len(industry_avg) > 0:
+                    show_figure('industry', lambda: charts.industry_average(industry_avg))
+            
+            with col2:
+                # Pay level distribution by industry
+                level_counts = insights['level_counts']
+                if level_counts is not None and len(level_counts) > 0:
+                    show_figure('stacked', lambda: charts.pay_level_mix(level_counts))
+            
+            # Top companies by industry
+            st.subheader("Top Paid CEOs by Industry")
+            
+            if 'Industry' in selection.columns:
+                valid_industries = selection.industries()
                 
-                if len(industry_data) > 0:
-                    display_cols = ['CEO_Name', 'Company', 'Salary']
-                    display_data = industry_data[display_cols].copy()
-                    display_data['Salary'] = display_data['Salary'].apply(lambda x: f"${x/1000000:.1f}M")
-                    
-                    if 'Pay_Ratio' in industry_data.columns:
-                        display_data['Pay Ratio'] = industry_data['Pay_Ratio'].apply(
-                            lambda x: f"{x:.0f}:1" if pd.notna(x) else "N/A"
-                        )
-                    
-                    st.dataframe(display_data, use_container_width=True, hide_index=True)
-    else:
-        st.warning("No data available with current filters.")
+                if valid_industries:
+                    top_ceos_by_industry(selection, valid_industries)
+            
+            st.subheader("🔎 Find a CEO")
+            find_ceo(selection, filter_key)
+        else:
+            st.warning("No data available with current filters.")
 
 # TAB 4: Performance Question
-with tab4:
-    st.header("The Performance Question: Does Pay Equal Performance?")
-    
-    if len(df_filtered) > 0:
-        col1, col2 = st.columns(2)
+with tab4, timer.section('tab4', rows=len(selection)):
+    if is_open(tab4):
+        st.header("The Performance Question: Does Pay Equal Performance?")
         
-        with col1:
-            # Tenure vs Salary scatter
-            if 'CEO_Tenure_Years' in df_filtered.columns:
-                df_tenure = df_filtered[df_filtered['CEO_Tenure_Years'].notna()]
-                
-                if len(df_tenure) > 0:
-                    fig_tenure = px.scatter(
-                        df_tenure,
-                        x='CEO_Tenure_Years',
-                        y='Salary',
-                        size='Market_Cap_Billions' if 'Market_Cap_Billions' in df_tenure.columns else None,
-                        color='Pay_Level',
-                        color_discrete_map=color_map,
-                        hover_data=['CEO_Name', 'Company'],
-                        title='CEO Experience vs Compensation'
-                    )
-                    
-                    fig_tenure.update_layout(
-                        height=450,
-                        xaxis=dict(title="Years as CEO"),
-                        yaxis=dict(tickformat='$,.0f', title="Total Compensation ($)")
-                    )
-                    
-                    st.plotly_chart(fig_tenure, use_container_width=True)
+        if len(selection) > 0:
+            scatters = engine.performance(selection)
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Tenure vs Salary scatter
+                df_tenure = scatters['tenure_rows']
+                if df_tenure is None:
+                    st.info("CEO tenure data not available")
+                elif len(df_tenure) > 0:
+                    show_scatter('tenure', df_tenure, charts.tenure_vs_salary, 'CEO_Tenure_Years', 'Salary')
                 else:
                     st.info("No tenure data available")
-            else:
-                st.info("CEO tenure data not available")
-        
-        with col2:
-            # Company size vs pay
-            if 'Employees' in df_filtered.columns:
-                df_employees = df_filtered[df_filtered['Employees'].notna()]
-                
-                if len(df_employees) > 0:
-                    fig_employees = px.scatter(
-                        df_employees,
-                        x='Employees',
-                        y='Salary',
-                        size='Market_Cap_Billions' if 'Market_Cap_Billions' in df_employees.columns else None,
-                        color='Industry',
-                        hover_data=['CEO_Name', 'Company'],
-                        title='Company Size vs CEO Pay',
-                        log_x=True
-                    )
-                    
-                    fig_employees.update_layout(
-                        height=450,
-                        xaxis=dict(title="Number of Employees (log scale)"),
-                        yaxis=dict(tickformat='$,.0f', title="CEO Compensation ($)")
-                    )
-                    
-                    st.plotly_chart(fig_employees, use_container_width=True)
+            
+            with col2:
+                # Company size vs pay
+                df_employees = scatters['employee_rows']
+                if df_employees is None:
+                    st.info("Employee count data not available")
+                elif len(df_employees) > 0:
+                    show_scatter('employees', df_employees, charts.size_vs_salary, 'Employees', 'Salary')
                 else:
                     st.info("No employee data available")
-            else:
-                st.info("Employee count data not available")
-        
-        # Correlation analysis
-        st.subheader("Correlation Analysis: What Drives CEO Pay?")
-        
-        numeric_cols = ['Salary']
-        if 'Market_Cap_Billions' in df_filtered.columns:
-            numeric_cols.append('Market_Cap_Billions')
-        if 'Employees' in df_filtered.columns:
-            numeric_cols.append('Employees')
-        if 'CEO_Tenure_Years' in df_filtered.columns:
-            numeric_cols.append('CEO_Tenure_Years')
-        if 'Pay_Ratio' in df_filtered.columns:
-            numeric_cols.append('Pay_Ratio')
-        
-        if len(numeric_cols) > 1:
-            df_corr = df_filtered[numeric_cols].dropna()
             
-            if len(df_corr) > 1:
-                corr_matrix = df_corr.corr()
-                
-                fig_corr = px.imshow(
-                    corr_matrix,
-                    text_auto='.2f',
-                    title='Correlation Matrix: Pay vs Performance Metrics',
-                    color_continuous_scale='RdBu',
-                    zmin=-1,
-                    zmax=1
+            # Correlation analysis
+            st.subheader("Correlation Analysis: What Drives CEO Pay?")
+            
+            with timer.section('tab4.corr', rows=len(selection)):
+                corr_matrix = engine.correlation(selection)
+            
+            if corr_matrix is not None:
+                show_figure('corr', lambda: charts.correlation_heatmap(corr_matrix))
+            
+            # The Buffett comparison
+            st.subheader("The Buffett Model: A Different Approach")
+            
+            buffett = engine.buffett_model(selection)
+            lowest_paid = buffett['lowest_paid']
+            total_actual = buffett['total_actual']
+            total_if_lowest = buffett['total_if_lowest']
+            savings = buffett['savings']
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric(
+                    label="Total CEO Compensation",
+                    value=f"${total_actual/1000000:.1f}M",
+                    delta=f"Across {buffett['rows']} companies"
                 )
-                
-                fig_corr.update_layout(height=500)
-                st.plotly_chart(fig_corr, use_container_width=True)
-        
-        # The Buffett comparison
-        st.subheader("The Buffett Model: A Different Approach")
-        
-        lowest_paid = df_filtered.loc[df_filtered['Salary'].idxmin()]
-        lowest_salary = lowest_paid['Salary']
-        
-        total_actual = df_filtered['Salary'].sum()
-        total_if_lowest = lowest_salary * len(df_filtered)
-        savings = total_actual - total_if_lowest
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric(
-                label="Total CEO Compensation",
-                value=f"${total_actual/1000000:.1f}M",
-                delta=f"Across {len(df_filtered)} companies"
-            )
-        
-        with col2:
-            st.metric(
-                label="If All Paid Like Lowest",
-                value=f"${total_if_lowest/1000000:.1f}M",
-                delta=f"At ${lowest_salary:,.0f} each"
-            )
-        
-        with col3:
-            st.metric(
-                label="Potential Savings",
-                value=f"${savings/1000000:.1f}M",
-                delta=f"{(savings/total_actual)*100:.1f}% reduction"
-            )
-        
-        st.warning(f"📊 **Conclusion:** If all CEOs were paid like {lowest_paid['CEO_Name']} ({lowest_paid['Company']}), " +
-                  f"companies could save ${savings/1000000:.1f}M annually!")
-    else:
-        st.warning("No data available with current filters.")
+            
+            with col2:
+                st.metric(
+                    label="If All Paid Like Lowest",
+                    value=f"${total_if_lowest/1000000:.1f}M",
+                    delta=f"At ${buffett['lowest_salary']:,.0f} each"
+                )
+            
+            with col3:
+                st.metric(
+                    label="Potential Savings",
+                    value=f"${savings/1000000:.1f}M",
+                    delta=f"{(savings/total_actual)*100:.1f}% reduction"
+                )
+            
+            st.warning(f"📊 **Conclusion:** If all CEOs were paid like {lowest_paid['CEO_Name']} ({lowest_paid['Company']}), " +
+                      f"companies could save ${savings/1000000:.1f}M annually!")
+        else:
+            st.warning("No data available with current filters.")
 
 # Footer
 st.markdown("---")
-st.markdown("*Data visualization created with Streamlit and Plotly*")
\ No newline at end of file
+st.markdown("*Data visualization created with Streamlit and Plotly*")
+
+# Record where this rerun spent its time
+timer.write(TIMING_LOG, filter_key)
+
+if ADMIN_MODE:
+    with st.sidebar:
+        st.markdown("---")
+        if st.toggle("Show rerun timings"):
+            with st.expander(f"⏱️ Rerun took {timer.elapsed_ms():.0f} ms", expanded=True):
+                load = dataset.df.attrs.get('load')
+                if load:
+                    st.caption(f"Dataset read from {load['format']} with {load['engine']} "
+                               f"in {load['read_ms']:.0f} ms (cached until the data changes)")
+                st.dataframe(timer.frame(), use_container_width=True, hide_index=True,
+                             column_config={'duration_ms': st.column_config.NumberColumn('ms', format='%.1f')})
+        if st.toggle("Show dataset memory"):
+            memory = engine.memory_report(dataset.df)
+            with st.expander(f"🧮 Dataset holds {memory['bytes'].sum() / 1e6:.1f} MB "
+                             f"({len(dataset):,} rows)", expanded=True):
+                st.dataframe(memory, use_container_width=True, hide_index=True,
+                             column_config={'bytes': st.column_config.NumberColumn('bytes', format='localized'),
+                                            'share': st.column_config.ProgressColumn('share', min_value=0, max_value=1)})
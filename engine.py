@@ -0,0 +1,461 @@
+"""Dashboard computations, independent of Streamlit.
+
+Everything the dashboard shows is computed here from a ``Dataset`` (the cleaned
+frame plus its load-time indexes) and a ``Selection`` of it, so the same
+numbers can be produced by batch jobs, worker processes and the benchmarks
+without importing Streamlit. ``dashboard.py`` only caches and renders these
+payloads.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+import snapshot
+import sources
+from cube import CUBE_MOMENTS, AggregateCube
+from filters import FilterIndex, SortedIndex, selection_key
+from parsers import PAY_LEVELS, clean_workbook, compact_dtypes
+from ranking import TopKIndex
+from search import SearchIndex
+
+# Default data source; any format in sources.READERS works
+DATA_FILE = 'Book1.xlsx'
+
+# Columns with a sidebar multiselect, backed by the filter index and the cube
+FILTER_COLUMNS = ['Industry', 'Pay_Level']
+
+# Numeric columns with a sidebar range slider, backed by the sorted index
+RANGE_COLUMNS = ['Salary', 'Market_Cap_Billions', 'CEO_Tenure_Years', 'Employees', 'Pay_Ratio']
+
+# Ranked column and the column with per-value top-K lists (Tab 3's industry picker)
+RANK_COLUMN = 'Salary'
+RANK_GROUP = 'Industry'
+
+# Text columns matched by the CEO search box
+SEARCH_COLUMNS = ['CEO_Name', 'Company', 'Ticker']
+
+# Numeric columns compared in the correlation matrix, in display order
+CORR_COLUMNS = CUBE_MOMENTS
+
+# Columns each table or chart reads; only these are materialized for the selected rows
+TOP20_COLUMNS = ['CEO_Name', 'Company', 'Salary', 'Pay_Level']
+TOP_EARNER_COLUMNS = ['CEO_Name', 'Company', 'Salary', 'Pay_Ratio']
+RATIO_COLUMNS = ['Salary', 'Pay_Ratio', 'Employees', 'Industry', 'CEO_Name', 'Company']
+TENURE_COLUMNS = ['CEO_Tenure_Years', 'Salary', 'Market_Cap_Billions', 'Pay_Level', 'CEO_Name', 'Company']
+EMPLOYEE_COLUMNS = ['Employees', 'Salary', 'Market_Cap_Billions', 'Industry', 'CEO_Name', 'Company']
+SEARCH_RESULT_COLUMNS = ['CEO_Name', 'Company', 'Ticker', 'Industry', 'Salary', 'Pay_Ratio']
+
+
+def source_digest(path, fmt=None):
+    # The same file read as another format (or SQLite table) is a different dataset
+    return snapshot.content_hash(path, salt=sources.describe(path, fmt))
+
+
+def load_frame(path=DATA_FILE, fmt=None, chunk_rows=0):
+    """Cleaned frame for a data source, reusing the Arrow snapshot when the file is unchanged.
+
+    ``fmt`` picks a reader from ``sources.READERS``; by default it follows the
+    file extension. With ``chunk_rows`` an Excel source is streamed and cleaned
+    that many rows at a time instead of being read whole. The content digest
+    is stored in ``df.attrs['digest']`` so dataset-level caches can key on it.
+    """
+    # Reuse the cleaned snapshot if the source hasn't changed since it was written
+    digest = source_digest(path, fmt)
+    start = time.perf_counter()
+    df = snapshot.read_snapshot(path, digest)
+    if df is None:
+        if chunk_rows and sources.source_format(path, fmt) == 'excel':
+            # Compacted chunk by chunk while streaming (see parsers.clean_chunks)
+            df = sources.read_clean_streaming(path, chunk_rows)
+        else:
+            df = compact_dtypes(clean_workbook(sources.read_source(path, fmt)))
+        # Save a typed snapshot so the next cold start skips reading the source
+        snapshot.write_snapshot(df, path, digest)
+    else:
+        df.attrs['load'] = _snapshot_load(start)
+    df.attrs['digest'] = digest
+    return df
+
+
+def map_frame(path=DATA_FILE, fmt=None, chunk_rows=0):
+    """Read-only frame backed by the memory-mapped snapshot, writing the snapshot first if needed.
+
+    Falls back to a private copy when the snapshot can't be written or mapped.
+    """
+    digest = source_digest(path, fmt)
+    start = time.perf_counter()
+    df = snapshot.map_snapshot(path, digest)
+    if df is None:
+        # Loading the source writes the snapshot; keep the private copy only if that failed
+        fallback = load_frame(path, fmt, chunk_rows)
+        df = snapshot.map_snapshot(path, digest)
+        if df is None:
+            df = fallback
+        else:
+            df.attrs['load'] = fallback.attrs.get('load')
+    else:
+        df.attrs['load'] = _snapshot_load(start)
+    df.attrs['digest'] = digest
+    return df
+
+
+def map_index(name, build, df, path=DATA_FILE):
+    """Load-time index of a frame, memory-mapped from next to its snapshot and saved there first if needed.
+
+    ``build`` makes the index from ``df`` when there is no saved copy yet. Like
+    the frame from ``map_frame``, the mapped arrays are shared by every worker
+    process through the page cache. Falls back to the privately built index
+    when it can't be saved or mapped.
+    """
+    digest = df.attrs.get('digest')
+    index = snapshot.map_index(path, digest, name) if digest else None
+    if index is None:
+        index = build(df)
+        if digest and snapshot.write_index(index, path, digest, name):
+            mapped = snapshot.map_index(path, digest, name)
+            if mapped is not None:
+                index = mapped
+    return index
+
+
+def _refuse_write(*args, **kwargs):
+    raise ValueError("The shared dataset is read-only; take a .copy() of it before modifying it")
+
+
+class _ReadOnlyIndexer:
+    """Wraps ``.loc``/``.iloc``/``.at``/``.iat`` so lookups work and assignments raise."""
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    __setitem__ = _refuse_write
+
+
+class ReadOnlyFrame(pd.DataFrame):
+    """A DataFrame that refuses in-place changes, for the dataset shared by every session.
+
+    Column and cell assignment, ``inplace=True`` methods and replacing the
+    index or columns raise ``ValueError``. Anything derived from the frame
+    (a filtered slice, ``.copy()``, a groupby result) is an ordinary
+    DataFrame, so code that builds on the shared data is unaffected.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(super().loc)
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(super().iloc)
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(super().at)
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(super().iat)
+
+    def __setattr__(self, name, value):
+        if name in ('columns', 'index'):
+            _refuse_write()
+        super().__setattr__(name, value)
+
+    __setitem__ = _refuse_write
+    __delitem__ = _refuse_write
+    insert = _refuse_write
+    pop = _refuse_write
+    _update_inplace = _refuse_write
+
+
+def freeze(df):
+    """Read-only view of ``df`` (see ReadOnlyFrame); the data itself is not copied."""
+    frozen = ReadOnlyFrame(df)
+    frozen.attrs.update(df.attrs)
+    return frozen
+
+
+def _snapshot_load(start):
+    # Same shape as the report sources.read_source leaves in attrs['load']
+    return {'format': 'snapshot', 'engine': 'pyarrow', 'read_ms': (time.perf_counter() - start) * 1000}
+
+
+def memory_report(df):
+    """Dtype and in-memory size of every column, largest first."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'column': usage.index,
+        'dtype': [str(df[col].dtype) for col in usage.index],
+        'bytes': usage.to_numpy(),
+    })
+    report['share'] = report['bytes'] / max(report['bytes'].sum(), 1)
+    return report.sort_values('bytes', ascending=False, ignore_index=True)
+
+
+def _is_label(value):
+    # Blank and stringified-missing industries are never offered or listed
+    return bool(value) and value != 'nan'
+
+
+class Dataset:
+    """A cleaned frame together with the indexes built once per dataset version."""
+
+    def __init__(self, df, filter_index=None, cube=None, ranking=None, sorted_index=None, search_index=None):
+        self.df = df
+        self.digest = df.attrs.get('digest')
+        self.filter_index = filter_index if filter_index is not None else FilterIndex.build(df, FILTER_COLUMNS)
+        self.cube = cube if cube is not None else AggregateCube.build(df)
+        self.ranking = ranking if ranking is not None else TopKIndex.build(df, RANK_COLUMN, group_by=RANK_GROUP)
+        self.sorted_index = sorted_index if sorted_index is not None else SortedIndex.build(df, RANGE_COLUMNS)
+        self.search_index = search_index if search_index is not None else SearchIndex.build(df, SEARCH_COLUMNS)
+        self._present = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def present(self, column):
+        """Boolean array of the rows that have a value in ``column``, computed once per dataset."""
+        if column not in self._present:
+            present = self.df[column].notna().to_numpy()
+            # Shared by every session once the dataset is cached, so callers can't change it under the others
+            present.flags.writeable = False
+            self._present[column] = present
+        return self._present[column]
+
+    def filter_options(self):
+        """Values offered by each sidebar multiselect."""
+        options = {}
+        if 'Industry' in self.df.columns:
+            options['Industry'] = [v for v in self.filter_index.values('Industry') if _is_label(v)]
+        if 'Pay_Level' in self.df.columns:
+            options['Pay_Level'] = [level for level in PAY_LEVELS
+                                    if level in self.df['Pay_Level'].cat.categories]
+        return options
+
+    def range_options(self):
+        """Smallest and largest value of each range-slider column that has values."""
+        options = {}
+        for col in RANGE_COLUMNS:
+            bounds = self.sorted_index.bounds(col)
+            if bounds is not None:
+                options[col] = bounds
+        return options
+
+    def facet_counts(self, selections, ranges=None):
+        """Rows each multiselect option would match, given the other filters and the ranges."""
+        in_ranges = self.sorted_index.mask(ranges or {})
+        within = None if in_ranges is None else np.packbits(in_ranges)
+        return self.filter_index.facet_counts(selections, within)
+
+    def select(self, selections, ranges=None):
+        return Selection(self, selections, ranges)
+
+
+class Selection:
+    """The rows of a dataset matching a sidebar selection, plus its headline KPIs.
+
+    The selection itself is only a boolean row mask over the shared frame.
+    Rows are materialized on demand, and then only the columns a table or
+    chart reads (see ``take``).
+
+    ``ranges`` maps range-slider columns to inclusive ``(low, high)`` bounds;
+    rows without a value in such a column are left out.
+    """
+
+    def __init__(self, dataset, selections, ranges=None):
+        self.dataset = dataset
+        self.selections = selections
+        self.ranges = ranges or {}
+        self.key = selection_key(selections, self.ranges)
+        # OR within each filter, AND across filters, over the precomputed bitmaps
+        self.mask = dataset.filter_index.mask(selections)
+        # Each range is a binary search over its sorted column
+        in_ranges = dataset.sorted_index.mask(self.ranges)
+        if in_ranges is not None:
+            self.mask = in_ranges if self.mask is None else self.mask & in_ranges
+        self._count = None
+        self._kpis = None
+        self._cube = None
+
+    def __len__(self):
+        if self._count is None:
+            self._count = len(self.dataset) if self.mask is None else int(np.count_nonzero(self.mask))
+        return self._count
+
+    @property
+    def columns(self):
+        return self.dataset.df.columns
+
+    @property
+    def rows(self):
+        """Every column of the selected rows, materialized on each access; prefer ``take``."""
+        return self.dataset.df if self.mask is None else self.dataset.df[self.mask]
+
+    def take(self, columns, present=None):
+        """The selected rows with only ``columns`` (those the dataset has).
+
+        With ``present`` only rows that have a value in that column are kept,
+        and None is returned when the dataset has no such column.
+        """
+        df = self.dataset.df
+        keep = self.mask
+        if present is not None:
+            if present not in df.columns:
+                return None
+            has = self.dataset.present(present)
+            keep = has if keep is None else keep & has
+        frame = df[[c for c in columns if c in df.columns]]
+        return frame if keep is None else frame[keep]
+
+    @property
+    def cube(self):
+        """The dataset's cube, re-aggregated over the selected rows when a range filter is active."""
+        if self._cube is None:
+            if self.ranges and self.mask is not None:
+                self._cube = self.dataset.cube.restrict(self.dataset.df, self.mask)
+            else:
+                self._cube = self.dataset.cube
+        return self._cube
+
+    @property
+    def kpis(self):
+        """Headline numbers combined from the cube's cells (see AggregateCube.summary)."""
+        if self._kpis is None:
+            self._kpis = self.cube.summary(self.selections)
+        return self._kpis
+
+    def industries(self):
+        """Industries present under the current filters, read off the cube cells."""
+        cells = self.cube.select(self.selections)
+        return sorted(ind for ind in cells['Industry'].unique() if _is_label(ind))
+
+    def row(self, label):
+        return self.dataset.df.loc[label]
+
+    def top(self, k, group=None, columns=None):
+        """The ``k`` best paid rows of the selection (optionally within one industry), best first."""
+        positions = self.dataset.ranking.top(k, mask=self.mask, group=group)
+        df = self.dataset.df
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df.iloc[positions]
+
+    def search(self, query, k=20, columns=None):
+        """Up to ``k`` selected rows whose name, company or ticker match ``query``, best match first."""
+        positions, _ = self.dataset.search_index.search(query, k, mask=self.mask)
+        df = self.dataset.df
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        return df.iloc[positions]
+
+
+def executive_summary(selection):
+    """KPIs, top-20 ranking and highest/lowest paid CEO for Tab 1."""
+    kpis = selection.kpis
+    max_salary = kpis['Salary_max']
+    min_salary = kpis['Salary_min']
+
+    max_ratio = min_ratio = ratio_gap = 0
+    if 'Pay_Ratio' in selection.columns and kpis['Pay_Ratio_count'] > 0:
+        max_ratio = kpis['Pay_Ratio_max']
+        min_ratio = kpis['Pay_Ratio_min']
+        ratio_gap = max_ratio / min_ratio if min_ratio > 0 else 0
+
+    # Top 20 by salary, walked off the load-time ranking
+    top20 = selection.top(20, columns=TOP20_COLUMNS)
+
+    return {
+        'rows': kpis['rows'],
+        'pay_gap': max_salary / min_salary if min_salary > 0 else 0,
+        'avg_salary': kpis['Salary_mean'],
+        'max_ratio': max_ratio,
+        'min_ratio': min_ratio,
+        'ratio_gap': ratio_gap,
+        'industries': kpis.get('industries', 0),
+        'top20': top20.sort_values('Salary', ascending=True),
+        'highest_paid': selection.row(kpis['Salary_argmax']),
+        'lowest_paid': selection.row(kpis['Salary_argmin']),
+    }
+
+
+def ratio_rows(selection):
+    """Rows with a pay ratio for the Tab 2 scatter and histogram (None without the column)."""
+    return selection.take(RATIO_COLUMNS, present='Pay_Ratio')
+
+
+def industry_stats(selection):
+    """Count, mean/min/max salary and mean/max pay ratio per industry, from the cube."""
+    grouped = selection.cube.group('Industry', selection.selections)
+    return grouped[[_is_label(ind) for ind in grouped.index]]
+
+
+def industry_insights(selection):
+    """Average salary per industry and Pay_Level counts per industry for Tab 3, from the cube."""
+    payload = {'industry_avg': None, 'level_counts': None}
+    if 'Industry' not in selection.columns:
+        return payload
+
+    grouped = industry_stats(selection)
+    payload['industry_avg'] = grouped['Salary_mean'].rename('Salary').sort_values(ascending=True)
+
+    if 'Pay_Level' in selection.columns:
+        # The cube's cells are exactly the Industry x Pay_Level counts, already filtered
+        cells = selection.cube.select(selection.selections)
+        cells = cells[[_is_label(ind) for ind in cells['Industry']]]
+        payload['level_counts'] = (cells.groupby(['Industry', 'Pay_Level'], observed=True)['rows'].sum()
+                                   .reset_index(name='count'))
+    return payload
+
+
+def top_earners(selection, industry, k=10):
+    """The ``k`` best paid CEOs of one industry under the current filters."""
+    return selection.top(k, group=industry, columns=TOP_EARNER_COLUMNS)
+
+
+def search_ceos(selection, query, k=20):
+    """CEOs under the current filters matching a search box query, by name, company or ticker."""
+    return selection.search(query, k, columns=SEARCH_RESULT_COLUMNS)
+
+
+def performance(selection):
+    """Rows for the Tab 4 tenure and company-size scatters."""
+    return {
+        'tenure_rows': selection.take(TENURE_COLUMNS, present='CEO_Tenure_Years'),
+        'employee_rows': selection.take(EMPLOYEE_COLUMNS, present='Employees'),
+    }
+
+
+def correlation(selection):
+    """Pearson matrix of the numeric columns over complete rows, or None if it can't be computed.
+
+    Assembled from the cube's per-cell sufficient statistics, so the cost
+    depends on the number of cells rather than rows.
+    """
+    return selection.cube.correlation(selection.selections)
+
+
+def buffett_model(selection):
+    """What the selection's CEOs would cost if all were paid like the lowest paid one."""
+    kpis = selection.kpis
+    lowest_paid = selection.row(kpis['Salary_argmin'])
+    # Python floats, so the product can't wrap in a narrow integer dtype
+    lowest_salary = float(lowest_paid['Salary'])
+
+    total_actual = kpis['Salary_sum']
+    total_if_lowest = lowest_salary * kpis['rows']
+    return {
+        'rows': kpis['rows'],
+        'lowest_paid': lowest_paid,
+        'lowest_salary': lowest_salary,
+        'total_actual': total_actual,
+        'total_if_lowest': total_if_lowest,
+        'savings': total_actual - total_if_lowest,
+    }
@@ -0,0 +1,60 @@
+import json
+import threading
+from collections import OrderedDict
+
+
+class FigureCache:
+    """Thread-safe LRU of serialized Plotly figures, bounded by total JSON size.
+
+    Entries are stored as JSON text, so one instance can be shared by every
+    session in the process (through ``st.cache_resource``) without handing the
+    same mutable figure to two scripts at once. Lookups return a fresh figure
+    dict that ``st.plotly_chart`` accepts directly.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(spec)
+
+    def put(self, key, figure):
+        """Store a figure (plotly Figure or dict) and hand it back unchanged."""
+        spec = figure.to_json() if hasattr(figure, 'to_json') else json.dumps(figure)
+        # Anything bigger than the whole budget would just evict everything else
+        if len(spec) > self.max_bytes:
+            return figure
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = spec
+            self.size += len(spec)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return figure
+
+    def get_or_build(self, key, build):
+        """Cached figure for ``key``, calling ``build()`` only on a miss."""
+        if self.max_bytes <= 0:
+            return build()
+        figure = self.get(key)
+        if figure is None:
+            figure = self.put(key, build())
+        return figure
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# Set bits in each byte value, for counting rows in packed bitmaps without np.bitwise_count
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def count_rows(bits):
+    """Number of rows set in a packed bitmap."""
+    # np.bitwise_count needs numpy 2.0; older versions count through the byte table
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(bits).sum())
+    return int(_POPCOUNT[bits].sum())
+
+
+class FilterIndex:
+    """Packed per-value bitmaps for the categorical sidebar filters.
+
+    Built once per dataset, so a filter selection is an OR of bitmaps within a
+    column and an AND across columns instead of an ``isin`` scan per rerun.
+    Bitmaps are stored with ``np.packbits`` (one bit per row).
+    """
+
+    def __init__(self, n_rows, bitmaps):
+        self.n_rows = n_rows
+        self.bitmaps = bitmaps
+
+    @classmethod
+    def build(cls, df, columns):
+        bitmaps = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col], sort=True)
+            bitmaps[col] = {
+                value: np.packbits(codes == code)
+                for code, value in enumerate(uniques)
+            }
+        return cls(len(df), bitmaps)
+
+    def values(self, column):
+        """Distinct values of an indexed column, in sorted order."""
+        return list(self.bitmaps.get(column, {}))
+
+    def bitmap(self, selections):
+        """Packed bitmap of rows matching every non-empty selection, or None if nothing is filtered.
+
+        ``selections`` maps a column to the values to keep; an empty or missing
+        selection leaves that column unfiltered, like the sidebar does.
+        """
+        result = None
+        for col, selected in selections.items():
+            if not selected or col not in self.bitmaps:
+                continue
+            by_value = self.bitmaps[col]
+            column_bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            for value in selected:
+                bits = by_value.get(value)
+                if bits is not None:
+                    np.bitwise_or(column_bits, bits, out=column_bits)
+            if result is None:
+                result = column_bits
+            else:
+                np.bitwise_and(result, column_bits, out=result)
+        return result
+
+    def facet_counts(self, selections, within=None):
+        """Rows per value of each indexed column, given the selections on the other columns.
+
+        A column's own selection is ignored, so each count is how many rows
+        picking that value would add. ``within`` is an optional packed bitmap
+        (e.g. the range filters) every count is further restricted to.
+        """
+        counts = {}
+        for col, by_value in self.bitmaps.items():
+            base = self.bitmap({c: selected for c, selected in selections.items() if c != col})
+            if within is not None:
+                base = within if base is None else base & within
+            counts[col] = {
+                value: count_rows(bits if base is None else bits & base)
+                for value, bits in by_value.items()
+            }
+        return counts
+
+    def mask(self, selections):
+        """Boolean row mask for a selection, or None if nothing is filtered."""
+        bits = self.bitmap(selections)
+        if bits is None:
+            return None
+        return np.unpackbits(bits, count=self.n_rows).view(bool)
+
+    def select(self, df, selections):
+        """Rows of ``df`` (the frame the index was built from) matching the selection."""
+        mask = self.mask(selections)
+        return df if mask is None else df[mask]
+
+
+def _value_dtype(values):
+    """numpy dtype of a numeric column, also for Arrow-backed and nullable ones (float64 otherwise)."""
+    dtype = getattr(values.dtype, 'numpy_dtype', values.dtype)
+    return dtype if isinstance(dtype, np.dtype) and dtype.kind in 'iuf' else np.dtype(np.float64)
+
+
+class SortedIndex:
+    """Row positions of numeric columns in ascending value order, for the range filters.
+
+    Built once per dataset, so a range resolves to a slice of the sorted order
+    by binary search and only the rows inside it (or, for wide ranges, the
+    rows outside it) are marked, instead of comparing the whole column on
+    every slider drag. Missing values are left out of the order, so they never
+    match a range.
+    """
+
+    def __init__(self, n_rows, orders, sorted_values, present):
+        self.n_rows = n_rows
+        self.orders = orders
+        self.sorted_values = sorted_values
+        self.present = present
+
+    @classmethod
+    def build(cls, df, columns):
+        orders = {}
+        sorted_values = {}
+        present = {}
+        # int32 positions whenever they fit: half the size of numpy's default int64
+        position_dtype = np.int32 if len(df) <= np.iinfo(np.int32).max else np.int64
+        for col in columns:
+            if col not in df.columns:
+                continue
+            values = df[col].to_numpy(dtype=float, na_value=np.nan)
+            present[col] = ~np.isnan(values)
+            positions = np.flatnonzero(present[col]).astype(position_dtype)
+            order = positions[np.argsort(values[positions], kind='stable')]
+            orders[col] = order
+            # Kept in the column's own (compacted) dtype; comparisons still promote the slider bounds
+            sorted_values[col] = values[order].astype(_value_dtype(df[col]))
+        return cls(len(df), orders, sorted_values, present)
+
+    def bounds(self, column):
+        """Smallest and largest value of an indexed column, or None if it has no values."""
+        values = self.sorted_values.get(column)
+        if values is None or len(values) == 0:
+            return None
+        # Python numbers, so arithmetic on them can't wrap around in an int8 column's dtype
+        return values[0].item(), values[-1].item()
+
+    def mask(self, ranges):
+        """Boolean mask of rows inside every ``(low, high)`` range (inclusive), or None if none apply."""
+        result = None
+        for col, (low, high) in ranges.items():
+            if col not in self.orders:
+                continue
+            order = self.orders[col]
+            start = np.searchsorted(self.sorted_values[col], low, side='left')
+            stop = np.searchsorted(self.sorted_values[col], high, side='right')
+            if stop - start > self.n_rows // 2:
+                # Wide range: start from every row with a value and clear the few outside it
+                inside = self.present[col].copy()
+                inside[order[:start]] = False
+                inside[order[stop:]] = False
+            else:
+                inside = np.zeros(self.n_rows, dtype=bool)
+                inside[order[start:stop]] = True
+            result = inside if result is None else result & inside
+        return result
+
+
+def selection_key(selections, ranges=None):
+    """Hashable, order-independent form of a filter selection, for cache keys."""
+    key = tuple(sorted((col, tuple(sorted(map(str, selected))))
+                       for col, selected in selections.items() if selected))
+    if ranges:
+        key += tuple(sorted((col, float(low), float(high)) for col, (low, high) in ranges.items()))
+    return key
@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# What a cleaned cell has to look like for the slow fallback path
+_NUMBER_PATTERN = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+
+
+def _to_arrow_strings(values):
+    """Arrow string array for a column, without going through Python objects when possible."""
+    try:
+        arr = pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed cells (e.g. Excel numbers next to "$1,234" text)
+        arr = pa.array(values.astype(str), from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    if not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        arr = pc.cast(arr, pa.string())
+    return arr
+
+
+def parse_numeric(values):
+    """Parse a workbook column such as "$1,234,567", "1,447:1" or 42 into float64.
+
+    Dollar signs, thousands separators and whitespace are dropped and ratios
+    keep their left-hand side. Anything that still isn't a number becomes NaN.
+    Columns Excel already gave us as numbers are returned without conversion.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values
+
+    arr = _to_arrow_strings(values)
+    arr = pc.replace_substring(arr, ',', '')
+    arr = pc.replace_substring(arr, '$', '')
+    if pc.any(pc.match_substring(arr, ':')).as_py():
+        arr = pc.list_element(pc.split_pattern(arr, ':', max_splits=1), 0)
+    arr = pc.utf8_trim_whitespace(arr)
+
+    try:
+        parsed = pc.cast(arr, pa.float64())
+    except pa.ArrowInvalid:
+        # Only pay for the regex when some cell isn't a clean number
+        valid = pc.match_substring_regex(arr, _NUMBER_PATTERN)
+        parsed = pc.cast(pc.if_else(valid, arr, pa.scalar(None, arr.type)), pa.float64())
+
+    return pd.Series(parsed.to_numpy(zero_copy_only=False), index=values.index,
+                     name=values.name, dtype=np.float64)
+
+
+# Workbook headers and the column names the dashboard uses for them
+COLUMN_MAPPING = {
+    'CEO Name': 'CEO_Name',
+    'Company': 'Company',
+    'Ticker': 'Ticker',
+    'Industry': 'Industry',
+    'Salary': 'Salary',
+    'Pay Ratio': 'Pay_Ratio',
+    'Median Worker Pay': 'Median_Worker_Pay',
+    'Market Cap (Billions)': 'Market_Cap_Billions',
+    'CEO Tenure (Years)': 'CEO_Tenure_Years',
+    'Employees': 'Employees',
+    'Pay Level': 'Pay_Level'
+}
+
+NUMERIC_COLUMNS = ['Salary', 'Pay_Ratio', 'Market_Cap_Billions', 'CEO_Tenure_Years', 'Employees', 'Median_Worker_Pay']
+STRING_COLUMNS = ['CEO_Name', 'Company', 'Ticker', 'Industry', 'Pay_Level']
+PAY_LEVELS = ['Minimal', 'Low', 'Medium', 'High', 'Extreme']
+# Dollar figures the dashboard totals and multiplies by row counts; never narrowed below 64 bits
+MONEY_COLUMNS = ['Salary', 'Median_Worker_Pay']
+
+# Arrow string columns that stay strings arrive in pandas as Arrow-backed strings, not Python objects
+_ARROW_STRINGS = {
+    pa.string(): pd.StringDtype('pyarrow', na_value=np.nan),
+    pa.large_string(): pd.StringDtype('pyarrow', na_value=np.nan),
+}
+
+
+def clean_workbook(df):
+    """Turn a raw Book1.xlsx-shaped frame into the typed frame the dashboard uses."""
+    # Clean column names - remove any extra spaces
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns=COLUMN_MAPPING)
+
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            # "$1,234,567", "1,447:1" and plain numbers in one vectorized pass
+            df[col] = parse_numeric(df[col])
+
+    for col in STRING_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip()
+
+    # Ensure Pay_Level is a category type with the correct order
+    if 'Pay_Level' in df.columns:
+        df['Pay_Level'] = pd.Categorical(df['Pay_Level'], categories=PAY_LEVELS, ordered=True)
+
+    # Remove any rows with missing critical data
+    return df.dropna(subset=['CEO_Name', 'Salary'])
+
+
+def clean_chunks(chunks, max_category_ratio=0.5):
+    """Clean raw frames one at a time and assemble them into one compact typed frame.
+
+    Each chunk goes through ``clean_workbook`` and is kept only as Arrow
+    columns, so the raw object cells of at most one chunk are alive at a time.
+    The result already has ``compact_dtypes``' dtypes: repeated strings are
+    dictionary-encoded while still in Arrow and arrive in pandas as
+    categoricals, and the final conversion releases the Arrow buffers as each
+    column is handed over. Row labels are the chunks' own (see
+    ``sources.iter_excel``). Every mapped column is numeric or stringified by
+    the cleaner, so a chunk never hands Arrow a column of mixed Python types
+    (e.g. numeric tickers next to text).
+    """
+    tables = []
+    for chunk in chunks:
+        tables.append(pa.Table.from_pandas(clean_workbook(chunk), preserve_index=True))
+    if not tables:
+        return compact_dtypes(clean_workbook(pd.DataFrame(columns=list(COLUMN_MAPPING))), max_category_ratio)
+    # A chunk with a missing value gets float64 where the others got int64, like a whole-sheet read would
+    table = pa.concat_tables(tables, promote_options='permissive')
+    del tables
+    strings, encoded = [], []
+    for i, field in enumerate(table.schema):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            strings.append(field.name)
+            column = table.column(i)
+            if pc.count_distinct(column).as_py() <= max_category_ratio * len(table):
+                # One dictionary across all chunks, built without Python strings
+                table = table.set_column(i, field.name, column.dictionary_encode())
+                encoded.append(field.name)
+    df = table.to_pandas(split_blocks=True, self_destruct=True, types_mapper=_ARROW_STRINGS.get)
+    del table
+    for col in encoded:
+        # Sorted categories and the narrowest codes, as astype('category') gives
+        df[col] = df[col].cat.set_categories(df[col].cat.categories.sort_values())
+    if 'Pay_Level' in df.columns:
+        df['Pay_Level'] = pd.Categorical(df['Pay_Level'], categories=PAY_LEVELS, ordered=True)
+    return compact_dtypes(df, columns=[col for col in df.columns if col not in strings])
+
+
+def compact_dtypes(df, max_category_ratio=0.5, keep=MONEY_COLUMNS, columns=None):
+    """Narrowest dtypes that hold every value of a cleaned frame exactly.
+
+    Strings repeated often enough (at most ``max_category_ratio`` distinct
+    values per row) become categoricals and the rest Arrow-backed strings.
+    Integer columns are downcast to the smallest integer type that fits, and
+    float columns become float32 only where every value survives the round
+    trip. Numeric columns in ``keep`` stay int64/float64: an int32 Salary
+    times a row count would wrap around instead of promoting. ``columns``
+    limits the pass to some of the columns.
+    """
+    for col in df.columns if columns is None else columns:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            continue
+        if col in keep and pd.api.types.is_numeric_dtype(values):
+            continue
+        if pd.api.types.is_string_dtype(values) or values.dtype == object:
+            if values.nunique(dropna=True) <= max_category_ratio * len(values):
+                df[col] = values.astype('category')
+            else:
+                df[col] = values.astype(pd.StringDtype('pyarrow', na_value=np.nan))
+        elif pd.api.types.is_integer_dtype(values):
+            df[col] = pd.to_numeric(values, downcast='integer')
+        elif pd.api.types.is_float_dtype(values) and values.dtype != np.float32:
+            narrow = values.astype(np.float32)
+            if ((narrow.astype(values.dtype) == values) | values.isna()).all():
+                df[col] = narrow
+    return df
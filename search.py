@@ -0,0 +1,328 @@
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Query words shorter than this only match by prefix; longer ones allow one edit, and two from FUZZY_TWO_EDITS
+FUZZY_MIN_LENGTH = 3
+FUZZY_TWO_EDITS = 6
+
+# Most trigram candidates checked by edit distance per query word, those sharing the most trigrams first
+FUZZY_MAX_CANDIDATES = 2000
+
+# Words are runs of letters and digits, lowercased
+_WORD = re.compile(r'[^\W_]+')
+_WORD_SEPARATOR = r'[^\p{L}\p{N}]+'
+
+
+def query_words(query):
+    return _WORD.findall(str(query).lower())
+
+
+def _trigrams(word):
+    # Byte trigrams of the word padded with one space on each side, so a word of N bytes has N
+    padded = b' ' + word.encode('utf-8') + b' '
+    return np.unique(np.array([padded[i] << 16 | padded[i + 1] << 8 | padded[i + 2]
+                               for i in range(len(padded) - 2)], dtype=np.int32))
+
+
+def max_edits(word):
+    """Edits a query word may be away from a fuzzy match."""
+    if len(word) < FUZZY_MIN_LENGTH:
+        return 0
+    return 1 if len(word) < FUZZY_TWO_EDITS else 2
+
+
+def edit_distance(a, b, limit):
+    """Damerau (optimal string alignment) distance, or ``limit + 1`` once it exceeds ``limit``.
+
+    Substitutions, insertions, deletions and swaps of adjacent characters
+    ("jmaes" -> "james") each count as one edit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def _offsets(values):
+    """Non-negative offsets or counts as int32 when they fit, int64 otherwise."""
+    if len(values) and values.max() > np.iinfo(np.int32).max:
+        return values.astype(np.int64)
+    return values.astype(np.int32)
+
+
+def _ranges(starts, stops):
+    """Concatenation of ``arange(start, stop)`` for each pair, without a Python loop."""
+    sizes = stops - starts
+    total = int(sizes.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(sizes) + sizes, sizes)
+    return np.arange(total) + offsets
+
+
+class _Vocabulary:
+    # Sorted words as an Arrow array, indexable by bisect without one Python string per word
+    def __init__(self, words):
+        self.words = words
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, i):
+        return self.words[i].as_py()
+
+
+class SearchIndex:
+    """Prefix and typo-tolerant word search over a few text columns.
+
+    Every distinct value of the searched columns is a *term*, split into
+    lowercased *words*. The words are kept sorted, so all words starting with a
+    typed prefix are one binary search away, and each word's byte trigrams are
+    posted in an inverted index. A word within one or two edits of a typo'd
+    query word keeps most of its trigrams, so counting postings narrows the
+    vocabulary to a few candidates before any edit distance is computed.
+    Words map to terms and terms to rows through CSR arrays, and each row keeps
+    its term per column, so scoring never touches the strings again.
+
+    A row matches when every query word matches some word of one of its
+    columns. Per query word a row scores 1 for an exact word, a bit less for a
+    prefix and at most 0.5 for a fuzzy match (see ``max_edits``); the scores
+    are added up. Words with digits (tickers, numbers) are never matched
+    fuzzily.
+    """
+
+    def __init__(self, columns, row_terms, term_bounds, rows_by_term, vocabulary, word_lengths, word_bounds,
+                 terms_by_word, word_rows, term_word_bounds, words_by_term, trigram_keys, trigram_bounds,
+                 words_by_trigram):
+        self.columns = columns
+        self.row_terms = row_terms
+        self.term_bounds = term_bounds
+        self.rows_by_term = rows_by_term
+        self.vocabulary = vocabulary
+        self.word_lengths = word_lengths
+        self.word_bounds = word_bounds
+        self.terms_by_word = terms_by_word
+        self.word_rows = word_rows
+        self.term_word_bounds = term_word_bounds
+        self.words_by_term = words_by_term
+        self.trigram_keys = trigram_keys
+        self.trigram_bounds = trigram_bounds
+        self.words_by_trigram = words_by_trigram
+
+    @property
+    def n_terms(self):
+        return len(self.term_bounds) - 1
+
+    @classmethod
+    def build(cls, df, columns):
+        columns = [c for c in columns if c in df.columns]
+        n_rows = len(df)
+
+        # Terms: the distinct values of each column, numbered across columns
+        codes = []
+        uniques = []
+        for col in columns:
+            col_codes, values = pd.factorize(df[col])
+            codes.append(col_codes)
+            uniques.append(pa.array(np.asarray(values, dtype=object), type=pa.string()))
+        offsets = np.cumsum([0] + [len(u) for u in uniques])
+        n_terms = int(offsets[-1])
+        # Missing values point at one extra term that never matches
+        row_terms = [np.where(c < 0, n_terms, c + off).astype(np.int32) for c, off in zip(codes, offsets)]
+
+        # Term -> rows, grouped by term
+        all_terms = np.concatenate(row_terms) if row_terms else np.zeros(0, dtype=np.int32)
+        order = np.argsort(all_terms, kind='stable')
+        rows_by_term = (order % max(n_rows, 1)).astype(np.int32)
+        term_bounds = _offsets(np.searchsorted(all_terms[order], np.arange(n_terms + 1)))
+
+        # Words: lowercased runs of letters and digits, sorted
+        terms = pa.concat_arrays(uniques) if uniques else pa.array([], type=pa.string())
+        parts = pc.split_pattern_regex(pc.utf8_lower(terms), pattern=_WORD_SEPARATOR)
+        words = pc.list_flatten(parts)
+        word_term = pc.list_parent_indices(parts).to_numpy()
+        keep = pc.greater(pc.binary_length(words), 0)
+        words = words.filter(keep)
+        word_term = word_term[keep.to_numpy(zero_copy_only=False)]
+        encoded = pc.dictionary_encode(words)
+        distinct = encoded.dictionary
+        rank = np.empty(len(distinct), dtype=np.int32)
+        by_word = pc.sort_indices(distinct).to_numpy()
+        rank[by_word] = np.arange(len(distinct), dtype=np.int32)
+        vocabulary = distinct.take(pa.array(by_word))
+        word_of_pair = rank[encoded.indices.to_numpy()]
+
+        # Term -> words (pairs are already in term order); the extra missing-value term has none
+        term_word_bounds = _offsets(np.searchsorted(word_term, np.arange(n_terms + 2)))
+        words_by_term = word_of_pair
+
+        # Word -> terms
+        order = np.argsort(word_of_pair, kind='stable')
+        terms_by_word = word_term[order].astype(np.int32)
+        word_bounds = _offsets(np.searchsorted(word_of_pair[order], np.arange(len(vocabulary) + 1)))
+        # Rows holding each word, counted once per column (to pick the most selective query word)
+        term_rows = np.cumsum(np.append(0, np.diff(term_bounds)[terms_by_word]))
+        word_rows = _offsets(term_rows[word_bounds[1:]] - term_rows[word_bounds[:-1]])
+
+        word_lengths = pc.utf8_length(vocabulary).to_numpy(zero_copy_only=False).astype(np.int32)
+        trigram_keys, trigram_bounds, words_by_trigram = cls._build_trigrams(vocabulary)
+        return cls(columns, row_terms, term_bounds, rows_by_term, vocabulary, word_lengths, word_bounds,
+                   terms_by_word, word_rows, term_word_bounds, words_by_term, trigram_keys, trigram_bounds,
+                   words_by_trigram)
+
+    @staticmethod
+    def _build_trigrams(vocabulary):
+        # Every word's padded byte trigrams, computed straight off the Arrow buffers
+        n_words = len(vocabulary)
+        offsets = np.frombuffer(vocabulary.buffers()[1], dtype=np.int32)[
+            vocabulary.offset:vocabulary.offset + n_words + 1].astype(np.int64)
+        data = np.frombuffer(vocabulary.buffers()[2], dtype=np.uint8) if n_words else np.zeros(0, dtype=np.uint8)
+        lengths = np.diff(offsets)
+        word = np.repeat(np.arange(n_words, dtype=np.int64), lengths)
+        # All words in one byte stream, each with a space before and after it
+        position = np.arange(len(word)) + 2 * word
+        padded = np.full(len(word) + 2 * n_words, ord(' '), dtype=np.int64)
+        padded[position + 1] = data[offsets[0]:offsets[-1]]
+        # Every byte starts one trigram of the padded stream (its word's first trigram starts at the leading space)
+        key = padded[position] << 16 | padded[position + 1] << 8 | padded[position + 2]
+
+        # One posting per distinct (trigram, word), grouped by trigram
+        pairs = np.sort(key << 32 | word)
+        pairs = pairs[np.append(True, pairs[1:] != pairs[:-1])]
+        keys = (pairs >> 32).astype(np.int32)
+        words_by_trigram = (pairs & 0xFFFFFFFF).astype(np.int32)
+        trigram_keys, starts = np.unique(keys, return_index=True)
+        trigram_bounds = _offsets(np.append(starts, len(keys)))
+        return trigram_keys, trigram_bounds, words_by_trigram
+
+    def _word_scores(self, word, fuzzy):
+        """Ids and scores of the vocabulary words matching one query word."""
+        vocab = _Vocabulary(self.vocabulary)
+        start = bisect.bisect_left(vocab, word)
+        stop = bisect.bisect_left(vocab, word + '\U0010ffff', lo=start)
+        ids = np.arange(start, stop)
+        # Exact words score 1, longer words less the more is left untyped
+        scores = 0.75 + 0.25 * len(word) / np.maximum(self.word_lengths[start:stop], 1)
+
+        # Numbers and tickers with digits only match as typed
+        edits = max_edits(word)
+        if fuzzy and edits and word.isalpha() and len(self.trigram_keys):
+            fuzzy_ids, distances = self._fuzzy_matches(word, edits)
+            outside = (fuzzy_ids < start) | (fuzzy_ids >= stop)
+            fuzzy_ids, distances = fuzzy_ids[outside], distances[outside]
+            lengths = np.maximum(self.word_lengths[fuzzy_ids], len(word))
+            ids = np.concatenate([ids, fuzzy_ids])
+            scores = np.concatenate([scores, 0.5 * (1 - distances / lengths)])
+        return ids, scores
+
+    def _fuzzy_matches(self, word, edits):
+        """Ids of the vocabulary words within ``edits`` edits of ``word``, and their distances."""
+        query = _trigrams(word)
+        at = np.minimum(np.searchsorted(self.trigram_keys, query), len(self.trigram_keys) - 1)
+        at = at[self.trigram_keys[at] == query]
+        postings = self.words_by_trigram[_ranges(self.trigram_bounds[at], self.trigram_bounds[at + 1])]
+        shared = np.bincount(postings, minlength=len(self.word_lengths))
+        # Each edit touches at most 4 of the padded trigrams (a swap), so a match keeps the rest
+        candidates = np.flatnonzero(shared >= max(1, len(query) - 4 * edits))
+        candidates = candidates[np.abs(self.word_lengths[candidates] - len(word)) <= edits]
+        if len(candidates) > FUZZY_MAX_CANDIDATES:
+            best = np.argsort(-shared[candidates], kind='stable')[:FUZZY_MAX_CANDIDATES]
+            candidates = np.sort(candidates[best])
+        distances = np.array([edit_distance(word, self.vocabulary[int(i)].as_py(), edits) for i in candidates],
+                             dtype=np.int64)
+        close = distances <= edits
+        return candidates[close], distances[close]
+
+    def _term_matches(self, ids, scores):
+        """Terms holding any of the vocabulary words ``ids`` (possibly repeated) and each one's score."""
+        sizes = self.word_bounds[ids + 1] - self.word_bounds[ids]
+        terms = self.terms_by_word[_ranges(self.word_bounds[ids], self.word_bounds[ids + 1])]
+        return terms, np.repeat(scores, sizes).astype(np.float32)
+
+    def _row_scores(self, ids, scores, rows):
+        """Each row's score for one query word, given the matched vocabulary words and their scores."""
+        matched_terms = int((self.word_bounds[ids + 1] - self.word_bounds[ids]).sum())
+        if rows is not None and 4 * len(rows) * len(self.row_terms) < matched_terms:
+            # Far fewer rows than matched terms: look the rows' words up among the matched ones
+            order = np.argsort(ids, kind='stable')
+            ids, scores = ids[order], scores[order]
+            best = np.zeros(len(rows), dtype=np.float32)
+            for codes in self.row_terms:
+                starts, stops = self.term_word_bounds[codes[rows]], self.term_word_bounds[codes[rows] + 1]
+                words = self.words_by_term[_ranges(starts, stops)]
+                at = np.minimum(np.searchsorted(ids, words), max(len(ids) - 1, 0))
+                hit = ids[at] == words if len(ids) else np.zeros(len(words), dtype=bool)
+                owner = np.repeat(np.arange(len(rows)), stops - starts)
+                np.maximum.at(best, owner[hit], scores[at[hit]].astype(np.float32))
+            return best
+
+        # A term's best score for the word, then a row's best over its columns
+        terms, term_scores = self._term_matches(ids, scores)
+        table = np.zeros(self.n_terms + 1, dtype=np.float32)
+        np.maximum.at(table, terms, term_scores)
+        best = None
+        for codes in self.row_terms:
+            score = table[codes if rows is None else codes[rows]]
+            best = score if best is None else np.maximum(best, score)
+        return best
+
+    def search(self, query, k=20, mask=None):
+        """Positions and scores of the ``k`` best rows matching ``query``, best first.
+
+        Typo-tolerant matching only kicks in when exact and prefix matches
+        find fewer than ``k`` rows. Only rows passing ``mask`` (a boolean array
+        or None) are considered; equal scores keep frame order.
+        """
+        positions, scores = self._search(query, k, mask, fuzzy=False)
+        if len(positions) < k:
+            positions, scores = self._search(query, k, mask, fuzzy=True)
+        return positions, scores
+
+    def _search(self, query, k, mask, fuzzy):
+        empty = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        words = query_words(query)
+        if not words or not self.row_terms:
+            return empty
+        matches = [self._word_scores(word, fuzzy) for word in words]
+
+        # Start from the rows of the query word matching the fewest, scoring the other words on those only
+        counts = [int(self.word_rows[ids].sum()) for ids, _ in matches]
+        first = int(np.argmin(counts))
+        if counts[first] == 0:
+            return empty
+        if counts[first] < len(self.row_terms[0]) // 8:
+            terms, _ = self._term_matches(*matches[first])
+            rows = np.sort(self.rows_by_term[_ranges(self.term_bounds[terms], self.term_bounds[terms + 1])])
+            rows = rows[np.append(True, rows[1:] != rows[:-1])]
+            if mask is not None:
+                rows = rows[mask[rows]]
+        else:
+            rows = None if mask is None else np.flatnonzero(mask)
+
+        total = None
+        for ids, scores in matches:
+            score = self._row_scores(ids, scores, rows)
+            total = score if total is None else np.where((total > 0) & (score > 0), total + score, 0)
+        hits = np.flatnonzero(total > 0)
+        if len(hits) > k:
+            # Rows beating the k-th best score, then the first rows tied with it
+            kth = -np.partition(-total[hits], k - 1)[k - 1]
+            better = hits[total[hits] > kth]
+            hits = np.concatenate([better, hits[total[hits] == kth][:k - len(better)]])
+        hits = hits[np.argsort(-total[hits], kind='stable')]
+        positions = hits if rows is None else rows[hits]
+        return positions.astype(np.int64), total[hits]
@@ -0,0 +1,207 @@
+import hashlib
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Where cleaned snapshots are kept between runs
+SNAPSHOT_DIR = os.environ.get('CEO_DASHBOARD_CACHE_DIR', '.snapshot_cache')
+
+# Bump this whenever the cleaning or dtype rules in engine.load_frame() or the attributes of a
+# saved index change so that old snapshots and indexes are never served for the new pipeline
+SNAPSHOT_VERSION = 5
+
+
+def content_hash(path, salt='', chunk_size=1 << 20):
+    """Return a hex digest of the file contents plus the snapshot version and ``salt``."""
+    digest = hashlib.sha256(f"v{SNAPSHOT_VERSION}:{salt}:".encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def snapshot_path(source, digest):
+    """Location of the Arrow IPC snapshot for a source file and digest."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(SNAPSHOT_DIR, f"{stem}-{digest}.arrow")
+
+
+def read_snapshot(source, digest):
+    """Load a previously written snapshot, or None if there isn't a usable one."""
+    path = snapshot_path(source, digest)
+    if not os.path.exists(path):
+        return None
+    try:
+        return pd.read_feather(path)
+    except Exception:
+        # A truncated or incompatible snapshot is just a cache miss
+        return None
+
+
+def _shared_dtype(arrow_type):
+    """pandas dtype that wraps an Arrow column without copying it."""
+    import pyarrow as pa
+
+    if pa.types.is_dictionary(arrow_type):
+        # Categoricals (Pay_Level) keep their ordered pandas dtype; only the codes are copied
+        return None
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    return pd.ArrowDtype(arrow_type)
+
+
+def map_snapshot(source, digest):
+    """Open a snapshot as a read-only, memory-mapped frame, or None if there isn't one.
+
+    Columns are backed directly by the mapped file, so every session and every
+    worker process that maps the same snapshot shares one copy in the OS page
+    cache instead of holding its own.
+    """
+    path = snapshot_path(source, digest)
+    if not os.path.exists(path):
+        return None
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return table.to_pandas(types_mapper=_shared_dtype, split_blocks=True)
+    except Exception:
+        return None
+
+
+def write_snapshot(df, source, digest):
+    """Write the cleaned frame as a typed Arrow IPC file and drop stale snapshots.
+
+    Failures (read-only disk, missing pyarrow, ...) are swallowed: the snapshot
+    is only an accelerator and the dashboard must still work without it.
+    """
+    path = snapshot_path(source, digest)
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # Uncompressed so the file can be memory-mapped without decoding
+        df.to_feather(tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+    except Exception:
+        return None
+
+    # Only the snapshot (and saved indexes) for the current contents of this source are worth keeping
+    prefix = os.path.basename(path).rsplit('-', 1)[0] + '-'
+    for name in os.listdir(SNAPSHOT_DIR):
+        rest = name[len(prefix):]
+        if not name.startswith(prefix) or '-' in rest or rest.startswith(f"{digest}."):
+            continue
+        try:
+            if name.endswith('.arrow'):
+                os.remove(os.path.join(SNAPSHOT_DIR, name))
+            elif name.endswith('.index'):
+                shutil.rmtree(os.path.join(SNAPSHOT_DIR, name))
+        except OSError:
+            pass
+    return path
+
+
+def index_path(source, digest, name):
+    """Directory of the load-time index ``name`` saved next to a source's snapshot."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(SNAPSHOT_DIR, f"{stem}-{digest}.{name}.index")
+
+
+class _Saved:
+    """Stands in for an array saved as its own file in an index directory."""
+
+    def __init__(self, number, arrow):
+        self.number = number
+        self.arrow = arrow
+
+
+def _detach(value, arrays):
+    # ``value`` with each array it holds (also inside dicts, lists and tuples) moved to ``arrays``
+    import pyarrow as pa
+
+    if isinstance(value, np.ndarray) and value.dtype != object and value.size:
+        arrays.append(value)
+        return _Saved(len(arrays) - 1, arrow=False)
+    if isinstance(value, pa.Array) and len(value):
+        arrays.append(value)
+        return _Saved(len(arrays) - 1, arrow=True)
+    if isinstance(value, dict):
+        return {key: _detach(item, arrays) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_detach(item, arrays) for item in value)
+    return value
+
+
+def _attach(value, path):
+    # The inverse of _detach, mapping each saved array read-only instead of reading it
+    import pyarrow as pa
+    import pyarrow.ipc
+
+    if isinstance(value, _Saved):
+        file = os.path.join(path, f"{value.number}.{'arrow' if value.arrow else 'npy'}")
+        if value.arrow:
+            return pa.ipc.open_file(pa.memory_map(file, 'r')).read_all().column(0).chunk(0)
+        return np.asarray(np.load(file, mmap_mode='r'))
+    if isinstance(value, dict):
+        return {key: _attach(item, path) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_attach(item, path) for item in value)
+    return value
+
+
+def write_index(index, source, digest, name):
+    """Save a load-time index next to the snapshot so ``map_index`` can map it, and return its path.
+
+    Every numpy or Arrow array the index holds becomes its own uncompressed
+    file and everything else is pickled. Failures are swallowed like in
+    ``write_snapshot``.
+    """
+    path = index_path(source, digest, name)
+    if os.path.isdir(path):
+        return path
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+
+        arrays = []
+        state = _detach(vars(index), arrays)
+        os.makedirs(tmp_path)
+        for number, values in enumerate(arrays):
+            if isinstance(values, np.ndarray):
+                np.save(os.path.join(tmp_path, f"{number}.npy"), values)
+            else:
+                table = pa.table({'values': values})
+                with pa.ipc.new_file(os.path.join(tmp_path, f"{number}.arrow"), table.schema) as writer:
+                    writer.write_table(table)
+        with open(os.path.join(tmp_path, 'index.pickle'), 'wb') as f:
+            pickle.dump((type(index), state), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        # Another process may have saved the same index first
+        return path if os.path.isdir(path) else None
+    return path
+
+
+def map_index(source, digest, name):
+    """An index saved by ``write_index`` with its arrays memory-mapped read-only, or None.
+
+    Like a mapped snapshot, the arrays stay in the OS page cache once for
+    every worker process instead of being held by each.
+    """
+    path = index_path(source, digest, name)
+    if not os.path.isdir(path):
+        return None
+    try:
+        with open(os.path.join(path, 'index.pickle'), 'rb') as f:
+            cls, state = pickle.load(f)
+        index = cls.__new__(cls)
+        index.__dict__.update(_attach(state, path))
+        return index
+    except Exception:
+        return None
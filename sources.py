@@ -0,0 +1,163 @@
+"""Readers for each supported data source, all returning the raw Book1.xlsx-shaped frame.
+
+Sources may use either the workbook's headers ("CEO Name") or the cleaned
+names ("CEO_Name"), and either formatted text ("$1,234") or plain numbers;
+``parsers.clean_workbook`` turns any of them into the same typed frame.
+"""
+import importlib.util
+import itertools
+import os
+import pathlib
+import time
+
+import pandas as pd
+
+from parsers import COLUMN_MAPPING, clean_chunks
+
+# Table read from SQLite databases
+SQLITE_TABLE = os.environ.get('CEO_DASHBOARD_SQLITE_TABLE', 'ceo_compensation')
+
+# Excel readers from fastest to slowest; the first installed one is used unless one is configured
+EXCEL_ENGINES = {'calamine': 'python_calamine', 'openpyxl': 'openpyxl'}
+EXCEL_ENGINE = os.environ.get('CEO_DASHBOARD_EXCEL_ENGINE', '')
+
+# Format assumed for each file extension when none is configured
+EXTENSIONS = {
+    '.xlsx': 'excel',
+    '.xlsm': 'excel',
+    '.xls': 'excel',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.db': 'sqlite',
+    '.sqlite': 'sqlite',
+    '.sqlite3': 'sqlite',
+}
+
+
+def installed_excel_engines():
+    return [engine for engine, module in EXCEL_ENGINES.items() if importlib.util.find_spec(module)]
+
+
+def excel_engine():
+    """The configured Excel engine, else the fastest one installed."""
+    if EXCEL_ENGINE:
+        return EXCEL_ENGINE
+    installed = installed_excel_engines()
+    return installed[0] if installed else 'openpyxl'
+
+
+def _is_mapped(header):
+    # Columns the dashboard never uses aren't converted at all
+    header = str(header).strip()
+    return header in COLUMN_MAPPING or header in COLUMN_MAPPING.values()
+
+
+def read_excel(path, engine=None):
+    return pd.read_excel(path, engine=engine or excel_engine(), usecols=_is_mapped)
+
+
+def iter_excel(path, chunk_rows):
+    """Raw frames of up to ``chunk_rows`` rows streamed from the first sheet, mapped columns only.
+
+    The sheet is opened in openpyxl's read-only mode, so cells are parsed as
+    they are reached instead of loading the whole workbook. Row labels run on
+    across chunks as they would in a single ``read_excel`` frame.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        keep = [i for i, name in enumerate(header) if name is not None and _is_mapped(name)]
+        columns = [str(header[i]) for i in keep]
+        start = 0
+        while True:
+            block = [[row[i] if i < len(row) else None for i in keep]
+                     for row in itertools.islice(rows, chunk_rows)]
+            if not block:
+                return
+            yield pd.DataFrame(block, columns=columns, index=pd.RangeIndex(start, start + len(block)))
+            start += len(block)
+    finally:
+        workbook.close()
+
+
+def read_csv(path):
+    # Arrow's multithreaded parser; every column the cleaner parses arrives as text or numbers
+    return pd.read_csv(path, engine='pyarrow')
+
+
+def read_parquet(path):
+    return pd.read_parquet(path)
+
+
+def read_sqlite(path):
+    import sqlite3
+
+    table = SQLITE_TABLE.replace('"', '""')
+    # Opened read-only so a misconfigured path never creates an empty database; as_uri()
+    # percent-encodes characters like '#' and '?' that would otherwise end the path
+    conn = sqlite3.connect(pathlib.Path(path).resolve().as_uri() + '?mode=ro', uri=True)
+    try:
+        return pd.read_sql_query(f'SELECT * FROM "{table}"', conn)
+    finally:
+        conn.close()
+
+
+READERS = {
+    'excel': read_excel,
+    'csv': read_csv,
+    'parquet': read_parquet,
+    'sqlite': read_sqlite,
+}
+
+
+def source_format(path, fmt=None):
+    """The configured format, or the one implied by the file extension."""
+    if not fmt:
+        fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt not in READERS:
+        raise ValueError(f"Unsupported data source {path!r} (format {fmt!r}); "
+                         f"expected one of {', '.join(READERS)}")
+    return fmt
+
+
+def describe(path, fmt=None):
+    """What, besides the file contents, determines the frame read from ``path``."""
+    fmt = source_format(path, fmt)
+    return f"{fmt}:{SQLITE_TABLE}" if fmt == 'sqlite' else fmt
+
+
+# Library doing the parsing for the formats without a choice of engine
+ENGINES = {'csv': 'pyarrow', 'parquet': 'pyarrow', 'sqlite': 'sqlite3'}
+
+
+def reader_engine(fmt):
+    return excel_engine() if fmt == 'excel' else ENGINES[fmt]
+
+
+def read_source(path, fmt=None):
+    """Raw frame from ``path``, read with the reader for its format.
+
+    How it was read is recorded in ``attrs['load']``: the format, the engine
+    and the read time in milliseconds.
+    """
+    fmt = source_format(path, fmt)
+    start = time.perf_counter()
+    raw = READERS[fmt](path)
+    raw.attrs['load'] = {'format': fmt, 'engine': reader_engine(fmt),
+                         'read_ms': (time.perf_counter() - start) * 1000}
+    return raw
+
+
+def read_clean_streaming(path, chunk_rows):
+    """Cleaned frame for an Excel source, read and cleaned ``chunk_rows`` rows at a time."""
+    start = time.perf_counter()
+    df = clean_chunks(iter_excel(path, chunk_rows))
+    df.attrs['load'] = {'format': 'excel', 'engine': f'openpyxl, streamed in {chunk_rows:,}-row chunks',
+                        'read_ms': (time.perf_counter() - start) * 1000}
+    return df
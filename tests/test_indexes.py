@@ -0,0 +1,212 @@
+"""The load-time indexes against the pandas operations they replace, on synthetic data with missing values."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import search
+import snapshot
+import synthetic
+from cube import CUBE_MOMENTS, AggregateCube
+from filters import FilterIndex, SortedIndex
+from parsers import PAY_LEVELS, clean_workbook
+from ranking import TopKIndex
+from search import SearchIndex, query_words
+
+RANGE_COLUMNS = ['Salary', 'Market_Cap_Billions', 'CEO_Tenure_Years', 'Employees', 'Pay_Ratio']
+SEARCH_COLUMNS = ['CEO_Name', 'Company', 'Ticker']
+
+
+@pytest.fixture(scope='module')
+def df():
+    df = clean_workbook(synthetic.generate(4000, seed=7, missing_ratio=0.1)).reset_index(drop=True)
+    rng = np.random.default_rng(7)
+    # Missing values in every column an index reads
+    df.loc[rng.random(len(df)) < 0.05, 'Ticker'] = None
+    df.loc[rng.random(len(df)) < 0.05, 'Company'] = None
+    return df
+
+
+def random_selections(df, rng):
+    industries = sorted(df['Industry'].unique())
+    return {
+        'Industry': list(rng.choice(industries, rng.integers(0, len(industries) + 1), replace=False)),
+        'Pay_Level': list(rng.choice(PAY_LEVELS, rng.integers(0, len(PAY_LEVELS) + 1), replace=False)),
+    }
+
+
+def random_ranges(df, rng):
+    ranges = {}
+    for col in rng.choice(RANGE_COLUMNS, rng.integers(0, 3), replace=False):
+        values = df[col].dropna()
+        # Narrow and wide ranges take different paths through SortedIndex.mask
+        low, high = np.sort(rng.choice(values.to_numpy(), 2))
+        if rng.random() < 0.5:
+            low = values.min()
+        ranges[col] = (float(low), float(high))
+    return ranges
+
+
+def isin_mask(df, selections, ranges=None):
+    mask = np.ones(len(df), dtype=bool)
+    for col, selected in selections.items():
+        if selected:
+            mask &= df[col].isin(selected).to_numpy()
+    for col, (low, high) in (ranges or {}).items():
+        mask &= df[col].between(low, high).to_numpy()
+    return mask
+
+
+def test_sorted_index_matches_between(df):
+    index = SortedIndex.build(df, RANGE_COLUMNS)
+    rng = np.random.default_rng(1)
+    assert index.mask({}) is None
+    for _ in range(100):
+        ranges = random_ranges(df, rng) or {'Salary': (0.0, float(df['Salary'].max()))}
+        np.testing.assert_array_equal(index.mask(ranges), isin_mask(df, {}, ranges))
+
+
+def test_filter_index_matches_isin(df):
+    index = FilterIndex.build(df, ['Industry', 'Pay_Level'])
+    rng = np.random.default_rng(5)
+    for _ in range(50):
+        selections = random_selections(df, rng)
+        mask = index.mask(selections)
+        np.testing.assert_array_equal(True if mask is None else mask, isin_mask(df, selections))
+
+        counts = index.facet_counts(selections)
+        for col, other in (('Industry', 'Pay_Level'), ('Pay_Level', 'Industry')):
+            expected = df[isin_mask(df, {other: selections[other]})][col].value_counts()
+            assert counts[col] == {value: int(expected.get(value, 0)) for value in counts[col]}
+
+
+def test_restricted_cube_matches_groupby(df):
+    cube = AggregateCube.build(df)
+    rng = np.random.default_rng(2)
+    for _ in range(50):
+        selections = random_selections(df, rng)
+        ranges = random_ranges(df, rng)
+        mask = isin_mask(df, {}, ranges)
+        rows = df[mask & isin_mask(df, selections)]
+        restricted = cube.restrict(df, mask)
+
+        grouped = restricted.group('Industry', selections)
+        expected = rows.groupby('Industry', sort=False)
+        pd.testing.assert_series_equal(grouped['rows'].sort_index(), expected.size().sort_index(),
+                                       check_names=False, check_dtype=False)
+        for stat in ('count', 'sum', 'min', 'max'):
+            pd.testing.assert_series_equal(grouped[f'Salary_{stat}'].sort_index(),
+                                           expected['Salary'].agg(stat).sort_index(),
+                                           check_names=False, check_dtype=False)
+
+        summary = restricted.summary(selections)
+        assert summary['rows'] == len(rows)
+        if rows['Pay_Ratio'].notna().any():
+            for stat in ('min', 'max'):
+                assert summary[f'Pay_Ratio_{stat}'] == rows['Pay_Ratio'].agg(stat)
+                # First row in frame order on ties, like idxmin/idxmax
+                assert summary[f'Pay_Ratio_arg{stat}'] == getattr(rows['Pay_Ratio'], f'idx{stat}')()
+        else:
+            assert summary['Pay_Ratio_argmax'] is None
+
+        corr = restricted.correlation(selections)
+        complete = rows[CUBE_MOMENTS].dropna()
+        if corr is not None:
+            np.testing.assert_allclose(corr.to_numpy(), complete.corr().to_numpy(), atol=1e-9)
+
+
+def test_top_k_matches_nlargest(df):
+    ranking = TopKIndex.build(df, 'Salary', group_by='Industry')
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        selections = random_selections(df, rng)
+        mask = isin_mask(df, selections)
+        k = int(rng.integers(1, 40))
+        expected = df[mask].nlargest(k, 'Salary', keep='first').index.to_numpy()
+        np.testing.assert_array_equal(df.index[ranking.top(k, mask=mask)], expected)
+
+        industry = rng.choice(sorted(df['Industry'].unique()))
+        rows = df[mask & (df['Industry'] == industry).to_numpy()]
+        expected = rows.nlargest(k, 'Salary', keep='first').index.to_numpy()
+        np.testing.assert_array_equal(df.index[ranking.top(k, mask=mask, group=industry)], expected)
+
+
+def brute_search(df, query, k, mask, fuzzy):
+    """Score every row word by word, the way SearchIndex documents it."""
+    words = [[query_words(v) if isinstance(v, str) else [] for v in df[col]] for col in SEARCH_COLUMNS]
+
+    def score(word, candidate):
+        if candidate == word:
+            return 1.0
+        if candidate.startswith(word):
+            return 0.75 + 0.25 * len(word) / len(candidate)
+        edits = search.max_edits(word)
+        if fuzzy and edits and word.isalpha():
+            shared = len(set(search._trigrams(word)) & set(search._trigrams(candidate)))
+            if shared >= max(1, len(search._trigrams(word)) - 4 * edits):
+                distance = search.edit_distance(word, candidate, edits)
+                if distance <= edits:
+                    return 0.5 * (1 - distance / max(len(word), len(candidate)))
+        return 0.0
+
+    totals = np.zeros(len(df), dtype=np.float32)
+    for row in range(len(df)):
+        if mask is not None and not mask[row]:
+            continue
+        total = 0.0
+        for word in query_words(query):
+            best = max([score(word, w) for col in words for w in col[row]], default=0.0)
+            if best == 0:
+                total = 0.0
+                break
+            total += best
+        totals[row] = total
+    hits = np.flatnonzero(totals > 0)
+    hits = hits[np.argsort(-totals[hits], kind='stable')][:k]
+    return hits, totals[hits]
+
+
+@pytest.mark.parametrize('query', ['james', 'smith j', 'jmaes smyth', 'patrcia', 'company 00001', 't00000a',
+                                   'c', 'zzz', ''])
+def test_search_matches_brute_force(df, query):
+    index = SearchIndex.build(df, SEARCH_COLUMNS)
+    rng = np.random.default_rng(4)
+    for mask in (None, rng.random(len(df)) < 0.4):
+        positions, scores = index.search(query, 10, mask)
+        # Typo tolerance only kicks in when exact and prefix matches find fewer than k rows
+        expected, expected_scores = brute_search(df, query, 10, mask, fuzzy=False)
+        if len(expected) < 10:
+            expected, expected_scores = brute_search(df, query, 10, mask, fuzzy=True)
+        np.testing.assert_array_equal(positions, expected)
+        np.testing.assert_allclose(scores, expected_scores, atol=1e-5)
+
+
+def test_saved_indexes_answer_like_built_ones(df, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_DIR', str(tmp_path))
+    built = {
+        'filter': FilterIndex.build(df, ['Industry', 'Pay_Level']),
+        'cube': AggregateCube.build(df),
+        'ranking': TopKIndex.build(df, 'Salary', group_by='Industry'),
+        'sorted': SortedIndex.build(df, RANGE_COLUMNS),
+        'search': SearchIndex.build(df, SEARCH_COLUMNS),
+    }
+    mapped = {}
+    for name, index in built.items():
+        assert snapshot.write_index(index, 'Book1.xlsx', 'digest', name)
+        mapped[name] = snapshot.map_index('Book1.xlsx', 'digest', name)
+        assert type(mapped[name]) is type(index)
+    # Mapped arrays are shared between processes, so nothing may write to them
+    assert not mapped['sorted'].orders['Salary'].flags.writeable
+
+    rng = np.random.default_rng(6)
+    for _ in range(20):
+        selections = random_selections(df, rng)
+        ranges = random_ranges(df, rng)
+        mask = isin_mask(df, selections, ranges)
+        assert mapped['filter'].facet_counts(selections) == built['filter'].facet_counts(selections)
+        np.testing.assert_array_equal(mapped['sorted'].mask(ranges), built['sorted'].mask(ranges))
+        np.testing.assert_array_equal(mapped['ranking'].top(10, mask=mask), built['ranking'].top(10, mask=mask))
+        pd.testing.assert_frame_equal(mapped['cube'].restrict(df, mask).group('Industry', selections),
+                                      built['cube'].restrict(df, mask).group('Industry', selections))
+        for query in ('james', 'jmaes smyth'):
+            for got, expected in zip(mapped['search'].search(query, 10, mask), built['search'].search(query, 10, mask)):
+                np.testing.assert_array_equal(got, expected)
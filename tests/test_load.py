@@ -0,0 +1,63 @@
+"""Loading and dtype compaction against plain float64 pandas on the same data."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine
+import snapshot
+import synthetic
+from parsers import MONEY_COLUMNS, NUMERIC_COLUMNS, clean_chunks, clean_workbook, compact_dtypes
+
+
+@pytest.fixture
+def raw():
+    raw = synthetic.generate(4000, seed=11)
+    # Whole-dollar salaries stored as numbers, as Parquet and SQLite sources often hold them;
+    # the lowest salary times the row count is well past the int32 range
+    rng = np.random.default_rng(11)
+    raw['Salary'] = rng.integers(1_000_000, 250_000_000, size=len(raw), dtype=np.int64)
+    return raw
+
+
+def test_compact_dtypes_keeps_values(raw):
+    df = clean_workbook(raw)
+    compact = compact_dtypes(df.copy())
+    for col in MONEY_COLUMNS:
+        assert compact[col].dtype.itemsize == 8
+    for col in NUMERIC_COLUMNS:
+        pd.testing.assert_series_equal(compact[col].astype(float), df[col].astype(float))
+    for col in ['CEO_Name', 'Company', 'Ticker', 'Industry']:
+        assert compact[col].astype(object).equals(df[col].astype(object))
+    assert isinstance(compact['Industry'].dtype, pd.CategoricalDtype)
+
+
+def test_clean_chunks_matches_whole_read():
+    raw = synthetic.generate(4000, seed=3, missing_ratio=0.1)
+    # Uneven chunks, so some hold missing values where others don't
+    chunks = [raw.iloc[start:start + 700].copy() for start in range(0, len(raw), 700)]
+    expected = compact_dtypes(clean_workbook(raw.copy()))
+    pd.testing.assert_frame_equal(clean_chunks(chunks), expected, check_index_type=False)
+
+
+def test_integer_source_matches_float_pandas(raw, tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    path = tmp_path / 'ceos.parquet'
+    synthetic.write_source(raw, str(path))
+
+    df = engine.load_frame(str(path))
+    expected = clean_workbook(raw.copy())
+    salary = expected['Salary'].astype(float)
+    selection = engine.Dataset(df).select({})
+
+    buffett = engine.buffett_model(selection)
+    assert buffett['lowest_salary'] == salary.min()
+    assert buffett['total_actual'] == pytest.approx(salary.sum())
+    assert buffett['total_if_lowest'] == pytest.approx(salary.min() * len(expected))
+    assert 0 <= buffett['savings'] <= buffett['total_actual']
+
+    summary = engine.executive_summary(selection)
+    assert summary['rows'] == len(expected)
+    assert summary['avg_salary'] == pytest.approx(salary.mean())
+    assert summary['pay_gap'] == pytest.approx(salary.max() / salary.min())
+    assert summary['highest_paid']['Salary'] == salary.max()
+    assert summary['lowest_paid']['Salary'] == salary.min()
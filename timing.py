@@ -0,0 +1,59 @@
+import datetime
+import hashlib
+import json
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+def filter_hash(key):
+    """Short stable digest of a normalized filter selection (see filters.selection_key)."""
+    return hashlib.sha1(repr(key).encode()).hexdigest()[:12]
+
+
+class RerunTimer:
+    """Wall-clock timings of the named sections of one script rerun.
+
+    Sections may nest (``tab2`` around ``tab2.industry_table``), so durations
+    are reported as measured rather than summed.
+    """
+
+    def __init__(self):
+        self.rerun_id = uuid.uuid4().hex[:12]
+        self.started = time.perf_counter()
+        self.records = []
+
+    @contextmanager
+    def section(self, name, rows=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append({
+                'section': name,
+                'duration_ms': (time.perf_counter() - start) * 1000,
+                'rows': rows,
+            })
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def frame(self):
+        """Sections in the order they finished, for display."""
+        return pd.DataFrame(self.records, columns=['section', 'duration_ms', 'rows'])
+
+    def write(self, path, filter_key=None):
+        """Append one JSON line per section to ``path``; logging never breaks the page."""
+        if not path or not self.records:
+            return
+        stamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        digest = filter_hash(filter_key) if filter_key is not None else None
+        try:
+            with open(path, 'a') as f:
+                for record in self.records:
+                    f.write(json.dumps({'ts': stamp, 'rerun': self.rerun_id,
+                                        'filter_hash': digest, **record}) + '\n')
+        except OSError:
+            pass